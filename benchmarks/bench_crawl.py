@@ -0,0 +1,112 @@
+"""End-to-end crawl throughput against a synthetic local site: pages/sec, forms/sec, peak RSS and CPU time.
+
+The site (see synthetic_site.py) runs in its own process, so the reported CPU
+time and RSS belong to the crawler alone. No network access is needed.
+
+    python benchmarks/bench_crawl.py --pages 10000 --latency lognormal --latency-ms 20 --form-share 0.3
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import WebCrawler  # noqa: E402
+from synthetic_site import LATENCY_MODELS, SyntheticSite, serve_in_process  # noqa: E402
+
+
+def run_crawl(base_url: str, args) -> dict:
+    crawler = WebCrawler(
+        base_url,
+        max_pages=args.pages,
+        timeout_minutes=args.timeout_minutes,
+        initial_concurrency=args.concurrency,
+        max_concurrency=args.concurrency,
+        requests_per_second=1_000_000,
+        conn_limit_per_host=args.concurrency,
+        output_path=None,
+        parser=args.parser,
+        parse_workers=args.parse_workers,
+        seen_store=args.seen_store,
+        expected_urls=args.pages + 1,
+        seed_sitemaps=args.seed_sitemaps
+    )
+    # Forms are only counted; keeping every record would skew peak RSS on large sites
+    crawler.keep_forms = False
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    asyncio.run(crawler.crawl())
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    # ru_maxrss is KiB on Linux; children covers parse worker processes
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    pages = crawler._pages_done
+    return {
+        'pages': pages,
+        'forms': crawler.forms_count,
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 1),
+        'forms_per_sec': round(crawler.forms_count / elapsed, 1),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_per_page_ms': round(1000 * cpu / pages, 3) if pages else 0.0,
+        'worker_cpu_seconds': round(children.ru_utime + children.ru_stime, 3),
+        'peak_rss_mb': round(peak_rss, 1),
+        'stage_latency': {stage: {key: round(value, 6) for key, value in stats.items()}
+                          for stage, stats in crawler.latency_snapshot().items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=1000, help='site size (1k to 1M)')
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--latency', choices=LATENCY_MODELS, default='fixed')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='typical (or mean) server latency')
+    parser.add_argument('--slow-ms', type=float, default=500.0, help='slow-mode latency for --latency bimodal')
+    parser.add_argument('--slow-ratio', type=float, default=0.05, help='share of slow pages for --latency bimodal')
+    parser.add_argument('--page-kb', type=float, default=20.0)
+    parser.add_argument('--form-share', type=float, default=0.2, help='share of pages carrying configured forms')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--parser', default='auto')
+    parser.add_argument('--parse-workers', type=int, default=0)
+    parser.add_argument('--seen-store', default='set')
+    parser.add_argument('--timeout-minutes', type=float, default=60)
+    parser.add_argument('--seed-sitemaps', action='store_true', help='seed the frontier from /sitemap.xml first')
+    parser.add_argument('--port', type=int, default=8780)
+    parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    site = SyntheticSite(args.pages, args.fanout, args.latency, args.latency_ms, args.slow_ms, args.slow_ratio,
+                         args.page_kb, args.form_share, args.seed)
+    with serve_in_process(site, args.port) as base_url:
+        result = run_crawl(base_url, args)
+    if not result['pages']:
+        sys.exit("The crawl fetched no pages")
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['pages']} pages, {result['forms']} forms in {result['seconds']:.2f}s")
+    print(f"  {result['pages_per_sec']:10.1f} pages/sec")
+    print(f"  {result['forms_per_sec']:10.1f} forms/sec")
+    print(f"  {result['cpu_seconds']:10.2f} s CPU ({result['cpu_per_page_ms']:.2f} ms/page)")
+    if args.parse_workers:
+        print(f"  {result['worker_cpu_seconds']:10.2f} s CPU in parse workers")
+    print(f"  {result['peak_rss_mb']:10.1f} MB peak RSS")
+    for stage, stats in result['stage_latency'].items():
+        print(f"  {stage:>10}: p50 {stats['p50'] * 1000:8.2f} ms  p99 {stats['p99'] * 1000:8.2f} ms  "
+              f"total {stats['sum']:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
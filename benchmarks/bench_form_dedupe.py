@@ -0,0 +1,88 @@
+"""Microbenchmark: form de-duplication by list scan vs. signature set.
+
+The list scan is what `form_data not in self.forms_found` used to do. It is
+quadratic, so it is timed on --scan-forms and extrapolated to --forms.
+
+    python benchmarks/bench_form_dedupe.py --forms 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import form_signature  # noqa: E402
+
+
+def make_forms(n: int) -> list:
+    # The second half repeats the first, as when pages are re-reached through other links
+    forms = []
+    for k in range(n):
+        i = k % max(1, n // 2)
+        url = f"https://example.com/vendor-profile-page-software/{i // 5}"
+        meta_info = {
+            'url': url,
+            'has_meta_keywords': True,
+            'has_meta_description': True,
+            'meta_keywords': 'crm, sales, pipeline',
+            'meta_description': 'A long description of the vendor profile page ' * 3,
+            'seo_issues': []
+        }
+        forms.append({
+            'url': url,
+            'form_id': f'form-{i % 5}',
+            'form_selector': f'form.form-{i % 5}',
+            'form_type': 'Software Profile Forms',
+            'fields': [
+                {'selector': f"input[name='field{j}']", 'type': 'text', 'required': j % 2 == 0}
+                for j in range(6)
+            ],
+            'meta_info': meta_info
+        })
+    return forms
+
+
+def dedupe_scan(forms: list) -> int:
+    found = []
+    for form in forms:
+        if form not in found:
+            found.append(form)
+    return len(found)
+
+
+def dedupe_signatures(forms: list) -> int:
+    seen = set()
+    for form in forms:
+        signature = form_signature(form)
+        if signature not in seen:
+            seen.add(signature)
+    return len(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--forms', type=int, default=50_000)
+    parser.add_argument('--scan-forms', type=int, default=5_000)
+    args = parser.parse_args()
+
+    forms = make_forms(args.forms)
+
+    started = time.perf_counter()
+    unique = dedupe_signatures(forms)
+    sig_seconds = time.perf_counter() - started
+
+    scan_n = min(args.scan_forms, args.forms)
+    started = time.perf_counter()
+    dedupe_scan(forms[:scan_n])
+    scan_seconds = time.perf_counter() - started
+    scan_extrapolated = scan_seconds * (args.forms / scan_n) ** 2
+
+    print(f"forms: {args.forms} ({unique} unique)")
+    print(f"  signature set: {sig_seconds:8.3f}s ({sig_seconds / args.forms * 1e6:.2f} us/form)")
+    print(f"  list scan:     {scan_seconds:8.3f}s at {scan_n} forms, "
+          f"~{scan_extrapolated:.1f}s extrapolated to {args.forms}")
+    print(f"  speedup:       ~{scan_extrapolated / sig_seconds:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Per-page logging overhead of extract(): the old import-time setup against the queued pipeline.
+
+"legacy" recreates the code before the queued pipeline: LegacyLoggingCrawler
+makes the old per-page calls (three eager f-string INFO lines and an SEO
+WARNING per page), and importing the module ran basicConfig at DEBUG, which
+formats and writes synchronously in the caller. The "legacy INFO" row is the
+same code at INFO, for comparison with "queued INFO". The other setups use
+configure_logging(), which only enqueues records and leaves formatting and I/O
+to a listener thread. "caller" is the time seen by the crawl loop; "total"
+also waits for the listener to drain. Output goes to /dev/null. Like timeit,
+every row reports the best of --rounds interleaved rounds, timed with the
+garbage collector off: the figure least disturbed by whatever else the
+machine is doing.
+
+    python benchmarks/bench_logging.py --pages 2000
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import forms_crawler  # noqa: E402
+from forms_crawler import WebCrawler, configure_logging, stop_logging  # noqa: E402
+from synthetic_site import SyntheticSite  # noqa: E402
+
+BASE_URL = 'http://127.0.0.1:8780'
+logger = forms_crawler.logger
+
+
+class LegacyLoggingCrawler(WebCrawler):
+    """WebCrawler with the per-page meta logging it had before the queued pipeline, kept only as a baseline"""
+
+    def _log_meta_info(self, url, meta_info):
+        logger.info(f"Meta analysis for {url}:")
+        logger.info(f"- Description present: {meta_info['has_meta_description']}")
+        logger.info(f"- Keywords present: {meta_info['has_meta_keywords']}")
+        if meta_info['seo_issues']:
+            logger.warning(f"SEO issues found: {', '.join(meta_info['seo_issues'])}")
+
+
+def legacy_setup(devnull, level=logging.DEBUG):
+    logging.basicConfig(level=level, stream=devnull, force=True)
+
+
+def legacy_teardown():
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()], force=True)
+
+
+def run(crawler: WebCrawler, pages: list, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in pages:
+            crawler.extract(url, html)
+    return (time.perf_counter() - started) / repeat
+
+
+def measure(crawler: WebCrawler, pages: list, repeat: int, setup, teardown):
+    """(caller, total) seconds per pass over pages, with the collector off as timeit does"""
+    setup()
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        caller = run(crawler, pages, repeat)
+        teardown()  # stop_logging() blocks until the listener has written everything
+        return caller, (time.perf_counter() - started) / repeat
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--page-kb', type=float, default=5.0)
+    parser.add_argument('--form-share', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--rounds', type=int, default=15, help='rounds per setup, interleaved; the best is reported')
+    args = parser.parse_args()
+
+    site = SyntheticSite(args.pages, page_kb=args.page_kb, form_share=args.form_share)
+    pages = [(BASE_URL + site.path(n), site.render(n)) for n in range(args.pages)]
+    crawler = WebCrawler(BASE_URL, output_path=None)
+    legacy = LegacyLoggingCrawler(BASE_URL, output_path=None)
+    devnull = open(os.devnull, 'w')
+
+    # Silence logging's last-resort handler so "disabled" really writes nothing
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()], force=True)
+    setups = [
+        ('disabled (default)', crawler, lambda: None, lambda: None),
+        ('legacy DEBUG, sync', legacy, lambda: legacy_setup(devnull), legacy_teardown),
+        ('legacy INFO, sync', legacy, lambda: legacy_setup(devnull, logging.INFO), legacy_teardown),
+        ('queued INFO', crawler, lambda: configure_logging('INFO', stream=devnull), stop_logging),
+        ('queued DEBUG', crawler, lambda: configure_logging('DEBUG', stream=devnull), stop_logging),
+        ('queued DEBUG, JSON', crawler, lambda: configure_logging('DEBUG', json_format=True, stream=devnull),
+         stop_logging),
+    ]
+
+    # Interleave the setups so drift on a busy machine hits all of them alike
+    results = {name: [] for name, *_ in setups}
+    for _ in range(args.rounds):
+        for name, target, setup, teardown in setups:
+            results[name].append(measure(target, pages, args.repeat, setup, teardown))
+    assert not forms_crawler.logger.handlers
+
+    baseline = None
+    print(f"{'setup':>20} {'caller us/page':>15} {'total us/page':>14} {'overhead':>9}")
+    for name, *_ in setups:
+        caller = min(caller for caller, _ in results[name])
+        total = min(total for _, total in results[name])
+        baseline = baseline or caller
+        print(f"{name:>20} {1e6 * caller / len(pages):15.1f} {1e6 * total / len(pages):14.1f} "
+              f"{1e6 * (caller - baseline) / len(pages):+8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Compare HTML parser backends: output equality on a golden corpus, then pages/sec.
+
+Every available backend must produce identical forms, fields, meta info and
+links for every page before any timing is reported.
+
+    python benchmarks/bench_parsers.py --pages 500
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import WebCrawler, available_parsers  # noqa: E402
+
+BASE_URL = 'https://example.com'
+
+FORM_PAGES = [
+    ('/', 'form#home-recommendations', '<form id="home-recommendations" action="/r">'),
+    ('/vendor-profile-page-software/acme', 'form.get-pricing-form', '<form class="lead get-pricing-form">'),
+    ('/vendor-profile-page-software/acme', 'form.watch-demo-form', '<form class="watch-demo-form" id="demo">'),
+    ('/vendor-profile-page-services/beta', 'form.get-quote-form', '<form class="get-quote-form">'),
+    ('/subcategory-page/crm', 'form.pricing-guide-form', '<form class="pricing-guide-form">'),
+    ('/contact-us', 'form.contact-form', '<form class="contact-form">'),
+    ('/get-free-advice', 'form.software-search-form', '<form class="software-search-form">'),
+]
+
+META_VARIANTS = [
+    '',
+    '<meta name="description" content="">',
+    '<meta name="description" content="  Find the best CRM software  ">',
+    '<meta name="description" content="CRM &amp; sales"><meta name="keywords" content="crm, sales">',
+    '<meta name="keywords">',
+]
+
+FIELD_VARIANTS = [
+    '<input name="email" type="email" required>',
+    '<input name="name">',
+    '<input type="hidden" name="token" value="x">',
+    '<input type="submit" value="Go">',
+    '<textarea name="message" data-required="true"></textarea>',
+    '<select name="size"><option>1</option><option>2</option></select>',
+    '<input type="checkbox" name="agree" required="required">',
+    '<div class="row"><input name="phone" type="tel"></div>',
+]
+
+
+def make_page(rng: random.Random, i: int, filler_paragraphs: int):
+    path, _, form_open = FORM_PAGES[i % len(FORM_PAGES)]
+    fields = ''.join(rng.sample(FIELD_VARIANTS, rng.randint(1, len(FIELD_VARIANTS))))
+    links = ''.join(
+        f'<li><a href="{rng.choice(["/category-page/", "/vendor-profile-page-software/", "/blog/", "#top", "mailto:a@b.c", ""])}{rng.randint(0, 999)}">link</a></li>'
+        for _ in range(rng.randint(20, 60))
+    )
+    filler = ''.join(f'<p>Paragraph {n} with <b>bold</b> and <i>italic</i> text.</p>' for n in range(filler_paragraphs))
+    html = (
+        f'<!DOCTYPE html><html><head><title>Page {i}</title>{META_VARIANTS[i % len(META_VARIANTS)]}</head>'
+        f'<body><nav><ul>{links}</ul></nav><main>{filler}{form_open}{fields}'
+        f'<button type="submit">Send</button></form></main><footer><a href="/contact-us">Contact</a></footer></body></html>'
+    )
+    return BASE_URL + path, html
+
+
+def extract(crawler: WebCrawler, url: str, html: str):
+    page = crawler.extract(url, html)
+    return page.forms, page.meta_info, page.links
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--filler', type=int, default=200, help='paragraphs of body text per page')
+    parser.add_argument('--workers', type=int, default=None, help='extract_many workers (default: all cores)')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(7)
+    corpus = [make_page(rng, i, args.filler) for i in range(args.pages)]
+    backends = available_parsers()
+    crawlers = {name: WebCrawler(BASE_URL, parser=name, output_path=None) for name in backends}
+
+    golden = [extract(crawlers['html.parser'], url, html) for url, html in corpus]
+    for name in backends:
+        for (url, html), expected in zip(corpus, golden):
+            if extract(crawlers[name], url, html) != expected:
+                raise SystemExit(f"{name} output differs from html.parser on {url}")
+    print(f"golden corpus: {len(corpus)} pages, identical output across {', '.join(backends)}")
+
+    for name in backends:
+        crawler = crawlers[name]
+        started = time.perf_counter()
+        for url, html in corpus:
+            crawler.extract(url, html)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>12}: {len(corpus) / elapsed:8.1f} pages/sec")
+
+    crawler = crawlers[backends[0]]
+    started = time.perf_counter()
+    for _ in crawler.extract_many(corpus, workers=args.workers):
+        pass
+    elapsed = time.perf_counter() - started
+    print(f"{backends[0]:>12}: {len(corpus) / elapsed:8.1f} pages/sec via extract_many (workers={args.workers or 'all'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Compare the worker-pool scheduler against the old batch-and-gather loop.
+
+Spins up a local aiohttp server whose pages have skewed latency (most pages are
+fast, a few are very slow) and reports pages/sec for both schedulers.
+
+    python benchmarks/bench_scheduler.py --pages 300 --concurrency 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+from aiohttp import web
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import WebCrawler  # noqa: E402
+
+
+class BatchCrawler(WebCrawler):
+    """The pre-worker-pool crawl loop, kept here only as a baseline"""
+
+    async def crawl(self):
+        self.start_time = datetime.now()
+        async with aiohttp.ClientSession() as session:
+            queue = [self.base_url]
+            self.visited.add(self.base_url)
+            self.all_urls.add(self.base_url)
+            site = self.sites[0]
+            while queue and not self._should_stop_crawling():
+                # _process_url charges completed fetches to the site, so the page budget holds here too
+                batch_size = min(self.max_concurrency, site.max_pages - site.pages_done)
+                current_batch = queue[:batch_size]
+                queue = queue[batch_size:]
+                results = await asyncio.gather(*[self._process_url(session, url) for url in current_batch])
+                for new_urls in results:
+                    queue.extend([url for url in new_urls if url not in self.visited])
+                    self.visited.update(url for url in new_urls if url not in self.visited)
+
+
+def make_app(pages: int, fanout: int, slow_ratio: float, fast_ms: float, slow_ms: float, seed: int):
+    rng = random.Random(seed)
+    delays = [slow_ms if rng.random() < slow_ratio else fast_ms for _ in range(pages)]
+
+    async def page(request):
+        n = int(request.match_info.get('n', 0))
+        await asyncio.sleep(delays[n % pages] / 1000)
+        links = ''.join(f'<a href="/page/{(n * fanout + i + 1) % pages}">p</a>' for i in range(fanout))
+        return web.Response(text=f'<html><head></head><body>{links}</body></html>', content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/', page)
+    app.router.add_get('/page/{n}', page)
+    return app
+
+
+async def run(crawler_cls, base_url: str, pages: int, concurrency: int):
+    # Start the adaptive limiter at full width so both loops get the same concurrency
+    crawler = crawler_cls(base_url, max_pages=pages, initial_concurrency=concurrency,
+                          max_concurrency=concurrency, requests_per_second=10_000, output_path=None)
+    started = time.perf_counter()
+    await crawler.crawl()
+    elapsed = time.perf_counter() - started
+    # Pages actually fetched; visited also holds URLs that were queued but never fetched
+    return crawler._pages_done, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--slow-ratio', type=float, default=0.1)
+    parser.add_argument('--fast-ms', type=float, default=10)
+    parser.add_argument('--slow-ms', type=float, default=500)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    runner = web.AppRunner(make_app(args.pages, args.fanout, args.slow_ratio, args.fast_ms, args.slow_ms, seed=1))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', args.port)
+    await site.start()
+    base_url = f'http://127.0.0.1:{args.port}'
+    try:
+        for name, cls in [('batch-and-gather', BatchCrawler), ('worker-pool', WebCrawler)]:
+            fetched, elapsed = await run(cls, base_url, args.pages, args.concurrency)
+            print(f"{name:>18}: {fetched / elapsed:8.1f} pages/sec ({fetched} pages in {elapsed:.2f}s)")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
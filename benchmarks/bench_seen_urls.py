@@ -0,0 +1,48 @@
+"""Memory per million URLs and false-positive rate of the seen-URL stores.
+
+    python benchmarks/bench_seen_urls.py --urls 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import make_seen_set  # noqa: E402
+
+
+def url(i: int, salt: str = '') -> str:
+    return f"https://www.example.com/vendor-profile-page-software/product-{salt}{i}/reviews?page={i % 7}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--urls', type=int, default=1_000_000)
+    parser.add_argument('--probes', type=int, default=200_000, help='unseen URLs used to measure false positives')
+    args = parser.parse_args()
+
+    print(f"{'store':>12} {'MB':>8} {'MB per 1M URLs':>15} {'false pos.':>11} {'insert us':>10} {'miss us':>8}")
+    for kind in ('set', 'fingerprint', 'bloom', 'bloom-lossy'):
+        tracemalloc.start()
+        started = time.perf_counter()
+        seen = make_seen_set(kind, expected_urls=args.urls)
+        for i in range(args.urls):
+            # URLs are built on the fly so only what the store retains is counted
+            seen.add(url(i))
+        elapsed = time.perf_counter() - started
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        probe_started = time.perf_counter()
+        false_positives = sum(url(i, salt='x') in seen for i in range(args.probes))
+        probe_elapsed = time.perf_counter() - probe_started
+        # bytes per URL is the same number as MB per million URLs
+        per_url = memory / args.urls
+        print(f"{kind:>12} {memory / 1e6:8.1f} {per_url:15.1f} "
+              f"{false_positives / args.probes:11.5%} {elapsed / args.urls * 1e6:10.2f} "
+              f"{probe_elapsed / args.probes * 1e6:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Measure multi-process sharded crawling against a single-process crawl.
+
+Serves a synthetic site (see synthetic_site.py) from a separate process and
+crawls it with ShardedCrawler at several process counts. Pages are large and
+fast so parsing, not the network, is the bottleneck.
+
+    python benchmarks/bench_sharding.py --pages 2000 --shards 1 2 4 8
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import ShardedCrawler  # noqa: E402
+from synthetic_site import SyntheticSite, serve_in_process  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--page-kb', type=float, default=50.0)
+    parser.add_argument('--latency-ms', type=float, default=1.0)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    site = SyntheticSite(args.pages, args.fanout, latency_ms=args.latency_ms, page_kb=args.page_kb, form_share=1.0)
+    with serve_in_process(site, args.port) as base_url:
+        baseline = None
+        for shards in args.shards:
+            # The page budget is split evenly but hash shards are not, so leave headroom for the whole site.
+            # Concurrency and rate are per host for the whole crawl; the shards split them too.
+            crawler = ShardedCrawler(base_url, num_shards=shards, output_path=None, max_pages=2 * args.pages,
+                                     initial_concurrency=args.concurrency, max_concurrency=args.concurrency,
+                                     requests_per_second=10_000, conn_limit_per_host=args.concurrency)
+            summary = crawler.run()
+            rate = summary['pages'] / summary['seconds']
+            baseline = baseline or rate
+            print(f"{shards:>3} processes: {rate:8.1f} pages/sec  {summary['pages']:>6} pages  "
+                  f"{summary['forms']:>6} forms  speedup {rate / baseline:4.2f}x")
+
+
+if __name__ == '__main__':
+    main()
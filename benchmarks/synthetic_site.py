@@ -0,0 +1,191 @@
+"""Deterministic synthetic site served by a local aiohttp app, shared by the benchmarks.
+
+Page n links to pages n*fanout+1 .. n*fanout+fanout (mod pages), so one crawl
+from "/" reaches every page; /sitemap.xml lists them all too. Everything about a page (its latency, whether it
+carries forms, its links) is derived from (seed, n) on request, so the server
+holds no per-page state and scales to millions of pages.
+
+    python benchmarks/synthetic_site.py --pages 100000 --port 8780
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import re
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from forms_crawler import WebCrawler  # noqa: E402
+
+LATENCY_MODELS = ('fixed', 'uniform', 'lognormal', 'bimodal')
+
+SITEMAP_URLS = 50_000  # Per-file limit of the sitemap protocol; bigger sites get a sitemap index
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+FILLER_BLOCK = '<div class="card"><h3>Lorem ipsum</h3><p>dolor sit amet, consectetur adipiscing elit</p></div>\n'
+
+
+def _form_html(selector: str, n: int) -> str:
+    """Minimal form matching a simple selector like "form.get-pricing-form" or "form#home-recommendations" """
+    ids = re.findall(r'#([\w-]+)', selector)
+    classes = re.findall(r'\.([\w-]+)', selector)
+    attrs = ''.join([f' id="{ids[0]}"' if ids else '', f' class="{" ".join(classes)}"' if classes else ''])
+    return (f'<form{attrs} action="/submit">'
+            f'<input type="email" name="email" required><input type="text" name="company{n}">'
+            f'<textarea name="message"></textarea><button type="submit">Send</button></form>')
+
+
+class SyntheticSite:
+    """Parameters of the generated site and the pure functions that render it"""
+
+    def __init__(self, pages: int = 1000, fanout: int = 4, latency: str = 'fixed', latency_ms: float = 5.0,
+                 slow_ms: float = 500.0, slow_ratio: float = 0.05, page_kb: float = 20.0, form_share: float = 0.2,
+                 seed: int = 1):
+        if latency not in LATENCY_MODELS:
+            raise ValueError(f"Unknown latency model {latency!r}; expected one of {LATENCY_MODELS}")
+        self.pages = pages
+        self.fanout = fanout
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.slow_ms = slow_ms
+        self.slow_ratio = slow_ratio
+        self.page_kb = page_kb
+        self.form_share = form_share
+        self.seed = seed
+
+        # Form pages live under the crawler's own configured (substring-matched) paths
+        form_configs = WebCrawler('http://127.0.0.1', output_path=None).form_configs
+        self.form_sections = [
+            (path.strip('/'), [selector for selector in config['selectors'] if selector.startswith('form')])
+            for path, config in form_configs.items()
+            if config.get('match', 'substring') == 'substring' and path != '/'
+        ]
+        self.filler = FILLER_BLOCK * max(0, int(page_kb * 1024 / len(FILLER_BLOCK)))
+
+    def _rng(self, n: int) -> random.Random:
+        return random.Random((self.seed << 32) ^ n)
+
+    def section(self, n: int):
+        """(path section, selectors) for a form page, None for a plain page"""
+        if n and self._rng(n).random() < self.form_share:
+            return self.form_sections[n % len(self.form_sections)]
+        return None
+
+    def path(self, n: int) -> str:
+        if n == 0:
+            return '/'
+        section = self.section(n)
+        return f'/{section[0]}/{n}' if section else f'/page/{n}'
+
+    def delay(self, n: int) -> float:
+        """Server-side latency of page n in seconds"""
+        rng = self._rng(n)
+        rng.random()  # Keep the form/plain draw independent of the latency draw
+        if self.latency == 'uniform':
+            ms = rng.uniform(0, 2 * self.latency_ms)
+        elif self.latency == 'lognormal':
+            ms = rng.lognormvariate(0, 1) * self.latency_ms / 1.6487  # Mean of lognormal(0, 1) is e**0.5
+        elif self.latency == 'bimodal':
+            ms = self.slow_ms if rng.random() < self.slow_ratio else self.latency_ms
+        else:
+            ms = self.latency_ms
+        return ms / 1000
+
+    def render(self, n: int) -> str:
+        section = self.section(n)
+        forms = ''.join(_form_html(selector, n) for selector in section[1]) if section else ''
+        links = ''.join(
+            f'<a href="{self.path((n * self.fanout + i + 1) % self.pages)}">page</a>' for i in range(self.fanout)
+        )
+        return (f'<html><head><title>Page {n}</title>'
+                f'<meta name="description" content="Synthetic page {n}"></head>'
+                f'<body>{self.filler}{forms}<nav>{links}</nav></body></html>')
+
+    def sitemap(self, base_url: str, part: Optional[int] = None) -> str:
+        """sitemap.xml for the site, or part `part` of it when the pages do not fit in one file"""
+        if part is None and self.pages > SITEMAP_URLS:
+            parts = ''.join(f'<sitemap><loc>{base_url}/sitemap-{k}.xml</loc></sitemap>'
+                            for k in range(-(-self.pages // SITEMAP_URLS)))
+            return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="{SITEMAP_NS}">{parts}</sitemapindex>'
+        start = (part or 0) * SITEMAP_URLS
+        urls = ''.join(f'<url><loc>{base_url}{self.path(n)}</loc></url>'
+                       for n in range(start, min(self.pages, start + SITEMAP_URLS)))
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{SITEMAP_NS}">{urls}</urlset>'
+
+    def form_pages(self) -> int:
+        """Number of pages carrying forms (walks every page; meant for small sites and reports)"""
+        return sum(1 for n in range(self.pages) if self.section(n))
+
+
+def make_app(site: SyntheticSite) -> web.Application:
+    async def page(request):
+        n = int(request.match_info.get('n', 0))
+        if not 0 <= n < site.pages or request.path != site.path(n):
+            raise web.HTTPNotFound()
+        await asyncio.sleep(site.delay(n))
+        return web.Response(text=site.render(n), content_type='text/html')
+
+    async def sitemap(request):
+        part = request.match_info.get('part')
+        text = site.sitemap(f'{request.scheme}://{request.host}', int(part) if part else None)
+        return web.Response(text=text, content_type='application/xml')
+
+    app = web.Application()
+    app.router.add_get('/', page)
+    app.router.add_get('/sitemap.xml', sitemap)
+    app.router.add_get('/sitemap-{part:\\d+}.xml', sitemap)
+    app.router.add_get('/{section}/{n:\\d+}', page)
+    return app
+
+
+def serve(site: SyntheticSite, port: int):
+    logging.disable(logging.WARNING)
+    web.run_app(make_app(site), host='127.0.0.1', port=port, print=None)
+
+
+@contextmanager
+def serve_in_process(site: SyntheticSite, port: int):
+    """Run the site in a separate process so it does not compete with the crawler's loop; yields the base URL"""
+    server = multiprocessing.Process(target=serve, args=(site, port), daemon=True)
+    server.start()
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or not server.is_alive():
+                    raise RuntimeError(f"Synthetic site did not start on port {port}")
+                time.sleep(0.05)
+        yield base_url
+    finally:
+        server.terminate()
+        server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--latency', choices=LATENCY_MODELS, default='fixed')
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    parser.add_argument('--page-kb', type=float, default=20.0)
+    parser.add_argument('--form-share', type=float, default=0.2)
+    parser.add_argument('--port', type=int, default=8780)
+    args = parser.parse_args()
+    serve(SyntheticSite(args.pages, args.fanout, args.latency, args.latency_ms, page_kb=args.page_kb,
+                        form_share=args.form_share), args.port)
+
+
+if __name__ == '__main__':
+    main()
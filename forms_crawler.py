@@ -1,32 +1,1847 @@
 import asyncio
+import bisect
+import fnmatch
 import csv
 import os
+import random
+import queue
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
 import re
-from urllib.parse import urljoin, urlparse
-from datetime import datetime
+import sqlite3
+import ssl
+import sys
+import time
+import zlib
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote_plus, unquote_plus, urljoin, urlparse
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import logging
+import logging.handlers
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 import aiohttp
-from typing import Dict
+import soupsieve
+from array import array
+from collections import deque, namedtuple
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional; fall back to BeautifulSoup
+    LexborHTMLParser = None
 
-logging.basicConfig(level=logging.DEBUG)  # Set to DEBUG for more verbose output
 logger = logging.getLogger(__name__)
 
+# Standard LogRecord attributes; anything else on a record arrived through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger and message plus any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that hands the record over untouched
+
+    The stock prepare() formats the message in the logging thread so records
+    can be pickled; the queue here never leaves the process, so formatting is
+    left to the listener thread. Arguments are formatted a moment later, so
+    log values rather than objects that are about to be mutated.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_log_listener = None
+_log_settings = None
+
+
+def set_log_level(level):
+    """Change the crawler's log level at runtime (a name like 'DEBUG' or a logging constant)"""
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def configure_logging(level='INFO', json_format: bool = False, stream=None,
+                      background: bool = True) -> Optional[logging.handlers.QueueListener]:
+    """Send the crawler's logs through a queue to a background thread that formats and writes them
+
+    Logging calls on the event loop only enqueue the record; %-formatting,
+    JSON encoding and I/O happen on the listener thread (background=False
+    writes synchronously instead). Nothing is installed at import time, so
+    until this is called only warnings reach stderr (via logging's
+    last-resort handler) and debug/info calls cost a level check.
+    """
+    global _log_listener, _log_settings
+    stop_logging()
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonLogFormatter() if json_format
+                         else logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    handler._forms_crawler = True  # Marks handlers stop_logging() may remove
+    if background:
+        log_queue = queue.SimpleQueue()
+        queue_handler = _LazyQueueHandler(log_queue)
+        queue_handler._forms_crawler = True
+        logger.addHandler(queue_handler)
+        _log_listener = logging.handlers.QueueListener(log_queue, handler)
+        _log_listener.start()
+    else:
+        logger.addHandler(handler)
+    logger.propagate = False
+    set_log_level(level)
+    _log_settings = (level, json_format, stream, os.getpid())
+    return _log_listener
+
+
+def stop_logging():
+    """Flush and stop the listener started by configure_logging and detach its handlers"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+    for handler in [h for h in logger.handlers if getattr(h, '_forms_crawler', False)]:
+        logger.removeHandler(handler)
+    logger.propagate = True
+
+
+def _restart_logging_in_child(background: bool = True):
+    """Forked processes inherit the queue handler but not the listener thread; set logging up again"""
+    global _log_listener
+    if _log_settings and _log_settings[3] != os.getpid():
+        _log_listener = None  # The parent's listener thread does not exist in this process
+        level = logger.level or _log_settings[0]  # Keep a level changed at runtime in the parent
+        configure_logging(level, *_log_settings[1:3], background=background)
+
+# Result of extracting one page: form records, meta tag analysis and crawlable links
+PageResult = namedtuple('PageResult', ['url', 'forms', 'meta_info', 'links'])
+
+# A matched form: its own attributes plus (tag, attrs) for each input/textarea/select inside it
+FormNode = namedtuple('FormNode', ['attrs', 'fields'])
+
+FIELD_TAGS = ['input', 'textarea', 'select']
+
+
+# tag, #id and .class parts only, e.g. "form.get-pricing-form" or "form#home-recommendations"
+SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$')
+
+
+class SelectorSet:
+    """Form selectors compiled once and matched together in a single DOM traversal
+
+    The soupsieve patterns are compiled here rather than on every select_one
+    call; `combined` is the selector group used to walk the document once.
+    Simple compound selectors are also reduced to (tag, id, classes) so
+    backends without a per-element match test can attribute hits themselves.
+    """
+
+    def __init__(self, selectors: list):
+        self.selectors = list(dict.fromkeys(selectors))
+        self.combined = ', '.join(self.selectors)
+        self.soup_patterns = [soupsieve.compile(selector) for selector in self.selectors]
+        self.soup_combined = soupsieve.compile(self.combined) if self.selectors else None
+
+        self.simple = {}
+        self.complex = []
+        for selector in self.selectors:
+            match = SIMPLE_SELECTOR_RE.match(selector.strip())
+            if match and (match.group(1) or match.group(2)):
+                parts = re.findall(r'([.#])([\w-]+)', match.group(2))
+                ids = {value for kind, value in parts if kind == '#'}
+                classes = frozenset(value for kind, value in parts if kind == '.')
+                self.simple[selector] = ((match.group(1) or '').lower(), ids, classes)
+            else:
+                self.complex.append(selector)
+        self.simple_combined = ', '.join(self.simple)
+
+    def simple_matches(self, tag: str, attrs: Dict) -> list:
+        """Simple selectors in this set that an element with this tag and attributes matches"""
+        element_classes = set((attrs.get('class') or '').split())
+        element_id = attrs.get('id')
+        return [
+            selector for selector, (want_tag, ids, classes) in self.simple.items()
+            if (not want_tag or want_tag == tag)
+            and all(element_id == wanted for wanted in ids)
+            and classes <= element_classes
+        ]
+
+
+class SoupDocument:
+    """Parsed page backed by BeautifulSoup ('html.parser' or the C-backed 'lxml' tree builder)"""
+
+    def __init__(self, html, features: str = 'html.parser'):
+        self._soup = BeautifulSoup(html, features)
+
+    def meta_content(self, name: str) -> Optional[str]:
+        """content of the first <meta name=...>, '' if it has none, None if the tag is missing"""
+        tag = self._soup.find('meta', attrs={'name': name})
+        return None if tag is None else tag.get('content', '')
+
+    def select_one(self, selector: str) -> Optional[FormNode]:
+        form = self._soup.select_one(selector)
+        return None if form is None else self._form_node(form)
+
+    @staticmethod
+    def _form_node(form) -> FormNode:
+        return FormNode(form.attrs, [(field.name, field.attrs) for field in form.find_all(FIELD_TAGS)])
+
+    def select_first(self, selector_set: SelectorSet) -> Dict:
+        """First match of every selector in the set (selector -> FormNode), from one traversal"""
+        found = {}
+        if not selector_set.selectors:
+            return found
+        patterns = list(zip(selector_set.selectors, selector_set.soup_patterns))
+        for element in selector_set.soup_combined.iselect(self._soup):
+            for selector, pattern in patterns:
+                if selector not in found and pattern.match(element):
+                    found[selector] = self._form_node(element)
+            if len(found) == len(patterns):
+                break
+        return found
+
+    def links(self) -> list:
+        return [link['href'] for link in self._soup.find_all('a', href=True)]
+
+
+class LexborDocument:
+    """Parsed page backed by selectolax's Lexbor engine (C, no Python tree)"""
+
+    def __init__(self, html):
+        self._tree = LexborHTMLParser(html)
+
+    @staticmethod
+    def _attrs(node) -> Dict:
+        # Lexbor reports valueless attributes (e.g. `required`) as None; BeautifulSoup uses ''
+        return {key: '' if value is None else value for key, value in node.attributes.items()}
+
+    def meta_content(self, name: str) -> Optional[str]:
+        tag = self._tree.css_first(f'meta[name="{name}"]')
+        return None if tag is None else tag.attributes.get('content') or ''
+
+    def select_one(self, selector: str) -> Optional[FormNode]:
+        form = self._tree.css_first(selector)
+        return None if form is None else self._form_node(form)
+
+    def _form_node(self, form) -> FormNode:
+        return FormNode(self._attrs(form), [(field.tag, self._attrs(field)) for field in form.css(', '.join(FIELD_TAGS))])
+
+    def select_first(self, selector_set: SelectorSet) -> Dict:
+        """First match of every selector in the set (selector -> FormNode), from one traversal"""
+        found = {}
+        if selector_set.simple:
+            for element in self._tree.css(selector_set.simple_combined):
+                for selector in selector_set.simple_matches(element.tag, element.attributes):
+                    if selector not in found:
+                        found[selector] = self._form_node(element)
+                if len(found) == len(selector_set.simple):
+                    break
+        # Lexbor's css_matches also looks at descendants, so anything that is not a
+        # plain tag/#id/.class selector is looked up on its own
+        for selector in selector_set.complex:
+            form = self.select_one(selector)
+            if form is not None:
+                found[selector] = form
+        return found
+
+    def links(self) -> list:
+        return [link.attributes['href'] or '' for link in self._tree.css('a[href]')]
+
+
+def available_parsers() -> list:
+    """Parser backends usable in this environment, fastest first"""
+    parsers = []
+    if LexborHTMLParser is not None:
+        parsers.append('selectolax')
+    if builder_registry.lookup('lxml') is not None:
+        parsers.append('lxml')
+    parsers.append('html.parser')
+    return parsers
+
+
+def get_parser(name: str = 'auto'):
+    """Return a callable turning HTML (str or bytes) into a parsed document"""
+    if name == 'auto':
+        name = available_parsers()[0]
+    if name not in available_parsers():
+        raise ValueError(f"Parser backend {name!r} is not available (have: {', '.join(available_parsers())})")
+    if name == 'selectolax':
+        return LexborDocument
+    return lambda html: SoupDocument(html, name)
+
+
+BODY_END_RE = re.compile(rb'</body\s*>', re.IGNORECASE)
+FORM_END_RE = re.compile(rb'</form\s*>', re.IGNORECASE)
+
+
+def start_tag_re(tag: str, attribute: str, value: str) -> re.Pattern:
+    """Byte pattern for a <tag ...> start tag whose id is value / whose class list contains value
+
+    Anchored to the attribute inside the tag so the same word in a stylesheet
+    URL, a script or the page text does not count.
+    """
+    token = re.escape(value.encode('utf-8'))
+    if attribute == 'class':
+        quoted = rb'"(?:[^"]*\s)?' + token + rb'(?=[\s"])|\'(?:[^\']*\s)?' + token + rb"(?=[\s'])"
+    else:
+        quoted = rb'"' + token + rb'"|\'' + token + rb"'"
+    name = re.escape(tag.encode('ascii')) if tag else rb'[a-z][\w-]*'
+    return re.compile(
+        rb'<(?i:' + name + rb')(?=[\s/>])[^>]*?\s(?i:' + attribute.encode('ascii') + rb')\s*=\s*(?:'
+        + quoted + rb'|' + token + rb'(?=[\s/>]))'
+    )
+
+
+PERCENT_ESCAPE_RE = re.compile(r'%([0-9A-Fa-f]{2})')
+
+
+class UrlCanonicalizer:
+    """Configurable URL canonicalization with an LRU memo
+
+    Lowercases scheme and host, drops default ports, fragments and repeated or
+    trailing slashes, decodes percent-escapes of unreserved characters, folds
+    index pages (e.g. /about/index.html -> /about), removes tracking
+    parameters and sorts what is left of the query. Navigation links repeat on
+    every page, so results are memoized.
+
+    Query handling, in order: drop_query removes the query entirely (the old
+    behaviour); otherwise a non-empty keep_params keeps only those names, and
+    strip_params (fnmatch patterns such as 'utm_*') removes matching names.
+    """
+
+    DEFAULT_PORTS = {'http': 80, 'https': 443}
+    TRACKING_PARAMS = ('utm_*', 'gclid', 'dclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'yclid')
+    INDEX_PAGES = ('index.html', 'index.htm', 'index.php', 'default.aspx', 'default.asp')
+    UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+    def __init__(self, keep_params: Iterable = (), strip_params: Iterable = TRACKING_PARAMS,
+                 drop_query: bool = False, index_pages: Iterable = INDEX_PAGES, memo_size: int = 100_000):
+        self.keep_params = frozenset(keep_params)
+        self.strip_params = tuple(strip_params)
+        self.drop_query = drop_query
+        self.index_pages = frozenset(page.lower() for page in index_pages)
+        self.memo_size = memo_size
+        self._strip_re = re.compile('|'.join(fnmatch.translate(p) for p in self.strip_params)) if self.strip_params else None
+        self.canonicalize = lru_cache(maxsize=memo_size)(self._canonicalize)
+
+    def __getstate__(self):
+        # The memo wraps a bound method and cannot be pickled (e.g. into parse workers)
+        state = dict(self.__dict__)
+        del state['canonicalize']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.canonicalize = lru_cache(maxsize=self.memo_size)(self._canonicalize)
+
+    def _decode_escape(self, match) -> str:
+        char = chr(int(match.group(1), 16))
+        return char if char in self.UNRESERVED else '%' + match.group(1).upper()
+
+    def _keep_param(self, name: str) -> bool:
+        if self.keep_params and name not in self.keep_params:
+            return False
+        return not (self._strip_re and self._strip_re.match(name))
+
+    def _canonicalize(self, url: str) -> str:
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+
+        host = (parsed.hostname or '').rstrip('.')
+        if ':' in host:
+            host = f"[{host}]"  # hostname strips the brackets of IPv6 literals
+        netloc = host
+        if parsed.port and parsed.port != self.DEFAULT_PORTS.get(scheme):
+            netloc = f"{host}:{parsed.port}"
+        if parsed.username:
+            userinfo = parsed.username + (f":{parsed.password}" if parsed.password else '')
+            netloc = f"{userinfo}@{netloc}"
+
+        path = PERCENT_ESCAPE_RE.sub(self._decode_escape, parsed.path)
+        path = re.sub(r'/+', '/', path)
+        segments = path.rsplit('/', 1)
+        if len(segments) == 2 and segments[1].lower() in self.index_pages:
+            path = segments[0]
+        path = path.rstrip('/')
+
+        query = ''
+        if parsed.query and not self.drop_query:
+            # Split by hand: parse_qsl + urlencode would rewrite a valueless '?foo' as '?foo='
+            params = []
+            for pair in parsed.query.split('&'):
+                name, sep, value = pair.partition('=')
+                name = unquote_plus(name)
+                if name and self._keep_param(name):
+                    params.append((name, sep, unquote_plus(value)))
+            query = '&'.join(quote_plus(name) + sep + quote_plus(value) for name, sep, value in sorted(params))
+
+        return f"{scheme}://{netloc}{path}" + (f"?{query}" if query else '')
+
+
+# Extensions that are never HTML; matched against the last path segment only
+NON_HTML_EXTENSIONS = frozenset([
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.pdf', '.zip', '.gz', '.css', '.js',
+    '.ico', '.xml', '.txt', '.json', '.doc', '.docx', '.xls', '.xlsx', '.mp4', '.mp3', '.woff', '.woff2'
+])
+# Extensions (besides none at all) that are expected to serve HTML
+HTML_EXTENSIONS = frozenset(['', '.html', '.htm', '.xhtml', '.shtml', '.php', '.asp', '.aspx', '.jsp', '.cfm'])
+HTML_CONTENT_TYPES = frozenset(['text/html', 'application/xhtml+xml'])
+
+
+def url_extension(url: str) -> str:
+    """Lowercased extension of the URL's last path segment ('' if none)"""
+    last_segment = urlparse(url).path.rsplit('/', 1)[-1]
+    return os.path.splitext(last_segment)[1].lower()
+
+
+class ContentTypeCache:
+    """Content types learned per path pattern, so known non-HTML URLs are never fetched
+
+    A pattern is the host, the first path segment and the extension, e.g.
+    ('example.com', 'downloads', '.bin'). After `min_observations` non-HTML
+    responses and no HTML ones, further URLs matching it are skipped.
+    """
+
+    def __init__(self, min_observations: int = 2):
+        self.min_observations = min_observations
+        self._patterns = {}
+
+    @staticmethod
+    def pattern(url: str) -> tuple:
+        parsed = urlparse(url)
+        path = parsed.path.strip('/')
+        # Only a directory counts as the first segment; a file at the root is no pattern of its own
+        first_segment = path.split('/', 1)[0] if '/' in path else ''
+        return parsed.netloc, first_segment, url_extension(url)
+
+    def record(self, url: str, is_html: bool):
+        counts = self._patterns.setdefault(self.pattern(url), [0, 0])
+        counts[0 if is_html else 1] += 1
+
+    def known_html(self, url: str) -> bool:
+        return self._patterns.get(self.pattern(url), (0, 0))[0] > 0
+
+    def known_non_html(self, url: str) -> bool:
+        html, other = self._patterns.get(self.pattern(url), (0, 0))
+        return html == 0 and other >= self.min_observations
+
+    def snapshot(self) -> Dict:
+        return {'/'.join(part for part in key if part): {'html': html, 'other': other}
+                for key, (html, other) in self._patterns.items()}
+
+
+def is_html_response(response: aiohttp.ClientResponse) -> bool:
+    """True if the Content-Type is HTML (a missing header is given the benefit of the doubt)"""
+    if 'Content-Type' not in response.headers:
+        return True
+    return response.content_type in HTML_CONTENT_TYPES
+
+
+class FormConfigMatcher:
+    """form_configs compiled once into a multi-pattern URL path matcher
+
+    Each config key matches the lowercased URL path in one of three ways, set
+    by the config's optional 'match' entry:
+      - 'exact':     the path equals the key (trailing slashes ignored)
+      - 'prefix':    the path starts with the key
+      - 'substring': the key occurs anywhere in the path (the default)
+    Exact keys are a dict lookup, prefix keys a trie walk and substring keys an
+    Aho-Corasick automaton, so a path is scanned once however many configs exist.
+    """
+
+    MATCH_KINDS = ('exact', 'prefix', 'substring')
+
+    def __init__(self, form_configs: Dict):
+        self._entries = list(form_configs.items())
+        self._exact = {}
+        self._prefix_trie = {}
+        # Aho-Corasick automaton: per-state transitions, failure links and outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [set()]
+
+        for index, (key, config) in enumerate(self._entries):
+            kind = config.get('match', 'substring')
+            pattern = key.lower()
+            if kind == 'exact':
+                self._exact.setdefault(self._strip_path(pattern), []).append(index)
+            elif kind == 'prefix':
+                node = self._prefix_trie
+                for char in pattern:
+                    node = node.setdefault(char, {})
+                node.setdefault(None, []).append(index)
+            elif kind == 'substring':
+                self._add_substring(pattern, index)
+            else:
+                raise ValueError(f"Unknown match kind {kind!r} for form config {key!r}; "
+                                 f"expected one of {', '.join(self.MATCH_KINDS)}")
+        self._build_failure_links()
+
+    @staticmethod
+    def _strip_path(path: str) -> str:
+        return path.rstrip('/') or '/'
+
+    def _add_substring(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._out[state].add(index)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+                queue.append(child)
+
+    def match(self, url: str) -> list:
+        """(key, config) pairs applying to url, in form_configs order"""
+        path = urlparse(url).path.lower() or '/'
+        hits = set(self._exact.get(self._strip_path(path), ()))
+
+        node = self._prefix_trie
+        for char in path:
+            hits.update(node.get(None, ()))
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            hits.update(node.get(None, ()))
+
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for char in path:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                hits.update(out[state])
+
+        return [self._entries[index] for index in sorted(hits)]
+
+
+def url_fingerprint(url: str) -> int:
+    """Stable non-zero 64-bit fingerprint of a URL"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+class FingerprintSet:
+    """Set of URLs stored as 64-bit fingerprints in an open-addressing array
+
+    About 16-32 bytes per URL instead of the few hundred a set of strings costs.
+    Two different URLs collide with probability ~n/2**64, which is negligible
+    at crawl scale. Iterating gives back fingerprints, not URLs.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 1 << max(4, (capacity * 2 - 1).bit_length())
+        self._slots = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._len = 0
+
+    def _find_slot(self, fingerprint: int) -> int:
+        slots, mask = self._slots, self._mask
+        index = fingerprint & mask
+        while True:
+            value = slots[index]
+            if value == 0 or value == fingerprint:
+                return index
+            index = (index + 1) & mask
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array('Q', bytes(8 * len(old) * 2))
+        self._mask = len(self._slots) - 1
+        for fingerprint in old:
+            if fingerprint:
+                self._slots[self._find_slot(fingerprint)] = fingerprint
+
+    def add(self, url: str):
+        self.add_fingerprint(url_fingerprint(url))
+
+    def add_fingerprint(self, fingerprint: int):
+        index = self._find_slot(fingerprint)
+        if self._slots[index] == 0:
+            self._slots[index] = fingerprint
+            self._len += 1
+            if self._len * 2 > len(self._slots):  # Keep load factor <= 0.5 so probes stay short
+                self._grow()
+
+    def update(self, urls: Iterable):
+        for url in urls:
+            self.add(url)
+
+    def has_fingerprint(self, fingerprint: int) -> bool:
+        return self._slots[self._find_slot(fingerprint)] != 0
+
+    def __contains__(self, url: str) -> bool:
+        return self.has_fingerprint(url_fingerprint(url))
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return (fingerprint for fingerprint in self._slots if fingerprint)
+
+    def memory_bytes(self) -> int:
+        return self._slots.itemsize * len(self._slots)
+
+
+class BloomFilter:
+    """Bloom filter over URL fingerprints: a few bits per URL, with false positives
+
+    Used on its own ('bloom-lossy') a false positive makes the crawler treat a
+    new URL as already seen, so size it with `expected_items` and `error_rate`
+    for the crawl at hand. BloomFingerprintSet puts one in front of an exact
+    store instead.
+    """
+
+    def __init__(self, expected_items: int = 1_000_000, error_rate: float = 0.001):
+        self.num_bits = max(64, int(-expected_items * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / expected_items * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._len = 0
+
+    def _fingerprint_positions(self, fingerprint: int):
+        # Double hashing: the two 32-bit halves of the fingerprint generate all k positions
+        h1, h2 = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, url: str):
+        self.add_fingerprint(url_fingerprint(url))
+
+    def add_fingerprint(self, fingerprint: int):
+        bits = self._bits
+        added = False
+        for position in self._fingerprint_positions(fingerprint):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        if added:
+            self._len += 1
+
+    def update(self, urls: Iterable):
+        for url in urls:
+            self.add(url)
+
+    def has_fingerprint(self, fingerprint: int) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7))
+                   for position in self._fingerprint_positions(fingerprint))
+
+    def __contains__(self, url: str) -> bool:
+        return self.has_fingerprint(url_fingerprint(url))
+
+    def __len__(self):
+        return self._len
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class BloomFingerprintSet:
+    """FingerprintSet with a Bloom filter in front: exact, like 'fingerprint', but not faster
+
+    Every filter hit is confirmed against the exact fingerprint table, so a
+    Bloom false positive never makes a new URL look seen. The filter only pays
+    for itself in front of an exact store that is expensive to probe. In
+    memory, one table probe is cheaper than the filter's k bit tests, so this
+    costs about 2 us more per lookup and ~1 MB more per million URLs than
+    FingerprintSet (see benchmarks/bench_seen_urls.py). It exists so
+    seen_store='bloom' stays exact; prefer 'fingerprint'.
+    """
+
+    def __init__(self, expected_items: int = 1_000_000, error_rate: float = 0.01):
+        self._bloom = BloomFilter(expected_items, error_rate)
+        self._exact = FingerprintSet(min(expected_items, 1 << 16))
+
+    def add(self, url: str):
+        fingerprint = url_fingerprint(url)
+        self._bloom.add_fingerprint(fingerprint)
+        self._exact.add_fingerprint(fingerprint)
+
+    def update(self, urls: Iterable):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint = url_fingerprint(url)
+        return self._bloom.has_fingerprint(fingerprint) and self._exact.has_fingerprint(fingerprint)
+
+    def __len__(self):
+        return len(self._exact)
+
+    def __iter__(self):
+        return iter(self._exact)
+
+    def memory_bytes(self) -> int:
+        return self._bloom.memory_bytes() + self._exact.memory_bytes()
+
+
+def make_seen_set(kind: str = 'set', expected_urls: int = 1_000_000):
+    """Seen-URL container
+
+    'set' (exact strings; fastest, largest), 'fingerprint' (64-bit hashes; the
+    compact choice), 'bloom' (fingerprints behind a Bloom filter; exact, but
+    slower and slightly larger than 'fingerprint') or 'bloom-lossy' (filter
+    only: smallest, but a false positive silently skips a new URL).
+    """
+    if kind == 'set':
+        return set()
+    if kind == 'fingerprint':
+        return FingerprintSet(min(expected_urls, 1 << 16))
+    if kind == 'bloom':
+        return BloomFingerprintSet(expected_urls)
+    if kind == 'bloom-lossy':
+        return BloomFilter(expected_urls)
+    raise ValueError(f"Unknown seen-URL store: {kind!r} "
+                     f"(expected 'set', 'fingerprint', 'bloom' or 'bloom-lossy')")
+
+
+class Frontier:
+    """Priority queue of URLs waiting to be crawled (lower priority value is popped first)"""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()  # Keeps FIFO order within a priority
+
+    def push(self, url: str, priority: float = 1):
+        heapq.heappush(self._heap, (priority, next(self._counter), url))
+
+    def pop(self) -> str:
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+
+class CrawlSite:
+    """One site of a crawl: its URL scope, page/time budgets, scheduling weight and frontier"""
+
+    def __init__(self, base_url: str, max_pages: int, timeout_minutes: float, weight: float = 1.0):
+        if weight <= 0:
+            raise ValueError(f"Site weight must be positive: {base_url}")
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        self.max_pages = max_pages
+        self.timeout_minutes = timeout_minutes
+        self.weight = weight
+        self.frontier = Frontier()
+        self.queued = 0  # URLs admitted to the frontier
+        self.in_flight = 0  # URLs handed to workers and not finished yet
+        self.pages_done = 0  # Completed fetches; max_pages is charged here, not at queue time
+        self.forms_count = 0
+        self.deadline = None  # time.monotonic() value, set when the crawl starts
+        self.pass_value = 0.0  # Stride-scheduling position; advances by 1/weight per pop
+
+    def in_scope(self, url: str) -> bool:
+        return url.startswith(self.base_url)
+
+    def timed_out(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def exhausted(self) -> bool:
+        """Out of page or time budget; nothing more is queued or handed out for this site"""
+        return self.pages_done >= self.max_pages or self.timed_out()
+
+    def can_dispatch(self) -> bool:
+        """Whether another URL may be handed out without the fetches in flight overrunning max_pages"""
+        return self.pages_done + self.in_flight < self.max_pages and not self.timed_out()
+
+    def stats(self) -> Dict:
+        return {'queued': self.queued, 'pages': self.pages_done, 'forms': self.forms_count,
+                'pending': len(self.frontier)}
+
+
+class SiteFrontier:
+    """Per-site frontiers behind the Frontier interface, popped in weighted round-robin order
+
+    Stride scheduling: the non-empty site with the lowest pass value is served
+    next and its pass advances by 1/weight, so over time each site gets pages
+    in proportion to its weight however large the other sites' backlogs are.
+    A site that goes idle rejoins at the current pass instead of catching up
+    in a burst. Sites that run out of budget are dropped from the rotation;
+    sites whose remaining budget is covered by fetches in flight are skipped.
+
+    `host_delay(host, in_flight)` reports how long a host needs before it can
+    take another request (math.inf: not until one of its fetches finishes).
+    Sites on a host that is not ready are skipped too, so a throttled host
+    does not tie up workers that could be fetching from the others.
+    """
+
+    def __init__(self, sites: list, host_delay=None):
+        self.sites = sites
+        self.host_delay = host_delay
+        for site in sites:
+            site.frontier = Frontier()
+        self._by_host = {}
+        for site in sites:
+            self._by_host.setdefault(site.host, []).append(site)
+        for candidates in self._by_host.values():
+            candidates.sort(key=lambda site: len(site.base_url), reverse=True)  # Most specific scope first
+        self._pass = 0.0
+        self._len = 0
+
+    def site_for(self, url: str) -> Optional[CrawlSite]:
+        """The site whose scope contains url, or None if it belongs to no configured site"""
+        parts = url.split('/', 3)
+        if len(parts) < 3:
+            return None
+        for site in self._by_host.get(parts[2], ()):
+            if site.in_scope(url):
+                return site
+        return None
+
+    def push(self, url: str, priority: float = 1):
+        site = self.site_for(url)
+        if site is None:
+            return
+        if not site.frontier:
+            site.pass_value = max(site.pass_value, self._pass)
+        site.frontier.push(url, priority)
+        self._len += 1
+
+    def _drop_exhausted(self):
+        for site in self.sites:
+            if site.frontier and site.exhausted():
+                self._len -= len(site.frontier)
+                site.frontier = Frontier()
+
+    def _host_delays(self) -> Dict[CrawlSite, float]:
+        """Seconds until each site with URLs to hand out can have one fetched"""
+        delays = {}
+        by_host = {}
+        for site in self.sites:
+            if not (site.frontier and site.can_dispatch()):
+                continue
+            if self.host_delay is None:
+                delays[site] = 0.0
+                continue
+            if site.host not in by_host:
+                in_flight = sum(other.in_flight for other in self._by_host[site.host])
+                by_host[site.host] = self.host_delay(site.host, in_flight)
+            delays[site] = by_host[site.host]
+        return delays
+
+    def ready_in(self) -> Optional[float]:
+        """Seconds until pop() may return a URL again; None if that waits on a fetch finishing"""
+        delays = [delay for delay in self._host_delays().values() if delay != math.inf]
+        return min(delays) if delays else None
+
+    def pop(self) -> Optional[str]:
+        """Next URL to fetch, or None if no site with queued URLs can take another fetch right now"""
+        ready = [site for site, delay in self._host_delays().items() if delay <= 0]
+        if not ready:
+            return None
+        site = min(ready, key=lambda site: site.pass_value)
+        self._pass = site.pass_value
+        site.pass_value += 1 / site.weight
+        site.in_flight += 1
+        self._len -= 1
+        return site.frontier.pop()
+
+    def done(self, url: str):
+        """Mark a URL returned by pop() as finished"""
+        site = self.site_for(url)
+        if site:
+            site.in_flight -= 1
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        self._drop_exhausted()
+        return self._len > 0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    async def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Wait until a token is available and take it; False (and no token) if that is after deadline"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            delay = self.wait_time()
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return False
+            await asyncio.sleep(delay)
+
+
+class HostController:
+    """AIMD concurrency limit plus token-bucket pacing for a single host
+
+    The limit grows by roughly one slot per window of healthy responses and is
+    cut multiplicatively on 429/503, Retry-After, a rising error rate or a
+    sustained TTFB rise: the median of the last ttfb_window responses above
+    ttfb_tolerance times the lowest median of the windows before it. Medians
+    ignore the slow tail a site always has; only the server getting slower
+    for most requests moves them.
+    """
+
+    def __init__(self, initial_concurrency: int, min_concurrency: int, max_concurrency: int,
+                 requests_per_second: float, backoff_factor: float = 0.5,
+                 ttfb_tolerance: float = 2.0, error_threshold: float = 0.1,
+                 ttfb_window: int = 20, baseline_windows: int = 8):
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.backoff_factor = backoff_factor
+        self.ttfb_tolerance = ttfb_tolerance
+        self.error_threshold = error_threshold
+        self.ttfb_window = ttfb_window
+        self.bucket = TokenBucket(requests_per_second, capacity=max(1.0, requests_per_second))
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.ttfb_median = None
+        self.ttfb_baseline = None
+        self.error_ewma = 0.0
+        self._ttfb_samples = []
+        self._window_medians = deque(maxlen=baseline_windows)
+        self._last_decrease = 0.0
+        self._waiters = []
+
+    async def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Wait for a free concurrency slot, any Retry-After pause and a token
+
+        Gives up and returns False (holding nothing) when that cannot happen
+        before deadline, a time.monotonic() value.
+        """
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            if deadline is None:
+                await waiter
+                continue
+            try:
+                await asyncio.wait_for(waiter, deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                return False
+        self.in_flight += 1
+        try:
+            delay = self.blocked_until - time.monotonic()
+            if deadline is not None and time.monotonic() + max(0.0, delay) > deadline:
+                self._release_slot()
+                return False
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not await self.bucket.acquire(deadline):
+                self._release_slot()
+                return False
+        except BaseException:
+            self._release_slot()
+            raise
+        return True
+
+    def ready_in(self) -> float:
+        """Seconds until a new request could start without sitting out a Retry-After pause or the token bucket"""
+        return max(0.0, self.blocked_until - time.monotonic(), self.bucket.wait_time())
+
+    def release(self, status: Optional[int], ttfb: Optional[float] = None, retry_after: Optional[float] = None):
+        """Free the slot and feed the response outcome into the controller"""
+        self._adjust(status, ttfb, retry_after)
+        self._release_slot()
+
+    def set_crawl_delay(self, delay: float):
+        """Honour a robots.txt Crawl-delay: at most one request per `delay` seconds, one at a time"""
+        if delay and delay > 0:
+            self.bucket = TokenBucket(min(self.bucket.rate, 1.0 / delay), capacity=1.0)
+            self.max_concurrency = self.min_concurrency
+            self.limit = min(self.limit, self.min_concurrency)
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _adjust(self, status: Optional[int], ttfb: Optional[float], retry_after: Optional[float]):
+        now = time.monotonic()
+        failed = status is None or status >= 500
+        self.error_ewma = 0.9 * self.error_ewma + (0.1 if failed else 0.0)
+
+        slow = False
+        if ttfb is not None:
+            self._ttfb_samples.append(ttfb)
+            if len(self._ttfb_samples) >= self.ttfb_window:
+                samples = sorted(self._ttfb_samples)
+                self._ttfb_samples = []
+                self.ttfb_median = samples[len(samples) // 2]
+                # The baseline rolls with the last few windows, so a site that is
+                # simply slower now is not backed off from forever
+                self.ttfb_baseline = min(self._window_medians) if self._window_medians else None
+                slow = bool(self.ttfb_baseline) and self.ttfb_median > self.ttfb_baseline * self.ttfb_tolerance
+                self._window_medians.append(self.ttfb_median)
+
+        throttled = status in (429, 503) or retry_after is not None
+        if throttled:
+            self.blocked_until = max(self.blocked_until, now + (retry_after or 1.0))
+
+        if throttled or slow or self.error_ewma > self.error_threshold:
+            # At most one decrease per observed round trip, otherwise a burst of
+            # bad responses from the same window collapses the limit to the floor
+            if throttled or now - self._last_decrease >= (self.ttfb_median or 1.0):
+                self.limit = max(self.min_concurrency, self.limit * self.backoff_factor)
+                self._last_decrease = now
+                logger.debug("Backing off to concurrency %.1f (status=%s, ttfb=%s)", self.limit, status, ttfb)
+        elif not failed:
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+
+class RobotsRules:
+    """robots.txt rules for one host, compiled for the configured user agent
+
+    Plain Allow/Disallow patterns live in a character trie, so a check walks
+    the path once; patterns using '*' or '$' are compiled to regexes. The
+    longest matching pattern wins and Allow wins ties (RFC 9309).
+    """
+
+    def __init__(self, robots_txt: str = '', user_agent: str = '*', allow_all: bool = True,
+                 unavailable: bool = False):
+        self.allow_all = allow_all
+        self.unavailable = unavailable  # robots.txt could not be fetched; the rules are a placeholder
+        self.crawl_delay = None
+        self.sitemaps = []
+        self._trie = {}
+        self._wildcards = []
+
+        groups = []
+        current = None
+        for raw_line in robots_txt.splitlines():
+            line = raw_line.split('#', 1)[0].strip()
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            key, value = key.strip().lower(), value.strip()
+            if key == 'sitemap':
+                self.sitemaps.append(value)
+            elif key == 'user-agent':
+                if current is None or current['rules'] or current['delay'] is not None:
+                    current = {'agents': [], 'rules': [], 'delay': None}
+                    groups.append(current)
+                current['agents'].append(value.lower())
+            elif current is not None and key in ('allow', 'disallow'):
+                current['rules'].append((value, key == 'allow'))
+            elif current is not None and key == 'crawl-delay':
+                try:
+                    current['delay'] = float(value)
+                except ValueError:
+                    pass
+
+        # Match our product token against each group's, case-insensitively; "FormCrawler/2.0" names us,
+        # "crawler" does not (RFC 9309)
+        token = self.product_token(user_agent)
+        selected = [g for g in groups if any(a != '*' and self.product_token(a) == token for a in g['agents'])]
+        if not selected:
+            selected = [g for g in groups if '*' in g['agents']]
+        for group in selected:
+            if group['delay'] is not None:
+                self.crawl_delay = group['delay']
+            for pattern, allow in group['rules']:
+                if pattern:  # An empty Disallow means "allow everything"
+                    self._add_rule(pattern, allow)
+
+    @staticmethod
+    def product_token(user_agent: str) -> str:
+        """'FormCrawler' out of 'FormCrawler/2.0 (+https://...)', lowercased"""
+        return re.split(r'[/\s]', user_agent.strip(), 1)[0].lower()
+
+    def _add_rule(self, pattern: str, allow: bool):
+        if '*' in pattern or pattern.endswith('$'):
+            anchored = pattern.endswith('$')
+            body = pattern[:-1] if anchored else pattern
+            regex = '.*'.join(re.escape(part) for part in body.split('*')) + ('$' if anchored else '')
+            self._wildcards.append((re.compile(regex), len(pattern), allow))
+            return
+        node = self._trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[None] = node.get(None, False) or allow
+
+    def allowed(self, path: str) -> bool:
+        """Whether a path (including any query string) may be fetched"""
+        if path == '/robots.txt':
+            return True
+        best_length, best_allow = -1, self.allow_all
+        node = self._trie
+        for length, char in enumerate(path, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                best_length, best_allow = length, node[None]
+        for regex, length, allow in self._wildcards:
+            if regex.match(path) and (length > best_length or (length == best_length and allow)):
+                best_length, best_allow = length, allow
+        return best_allow
+
+
+class RobotsCache:
+    """Fetches robots.txt once per host and keeps the compiled rules
+
+    A robots.txt that times out or answers 5xx is cached as `unavailable` for
+    only `failure_ttl` seconds and then fetched again. After `max_failures`
+    failures in a row the host is treated as fully disallowed (RFC 9309).
+    """
+
+    def __init__(self, user_agent: str = '*', failure_ttl: float = 30.0, max_failures: int = 3):
+        self.user_agent = user_agent
+        self.failure_ttl = failure_ttl
+        self.max_failures = max_failures
+        self._rules = {}
+        self._pending = {}
+        self._expires = {}
+        self._failures = {}
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _lookup(self, key: str) -> Optional[RobotsRules]:
+        rules = self._rules.get(key)
+        if rules is not None and rules.unavailable and time.monotonic() >= self._expires[key]:
+            del self._rules[key]
+            return None
+        return rules
+
+    def cached(self, url: str) -> Optional[RobotsRules]:
+        return self._lookup(self._host_key(url))
+
+    def retry_delay(self, url: str) -> float:
+        """Seconds until an unavailable robots.txt for url's host is fetched again"""
+        return max(0.0, self._expires.get(self._host_key(url), 0.0) - time.monotonic())
+
+    def allowed(self, url: str) -> bool:
+        """Cheap synchronous check; hosts whose robots.txt is not loaded yet (or failed to load) are allowed"""
+        rules = self._lookup(self._host_key(url))
+        if rules is None or rules.unavailable:
+            return True
+        parsed = urlparse(url)
+        return rules.allowed((parsed.path or '/') + (f"?{parsed.query}" if parsed.query else ''))
+
+    async def rules_for(self, session: aiohttp.ClientSession, url: str, headers: Dict) -> RobotsRules:
+        """Rules for url's host, fetching robots.txt the first time (concurrent callers share one fetch)"""
+        key = self._host_key(url)
+        rules = self._lookup(key)
+        if rules is not None:
+            return rules
+        if key not in self._pending:
+            self._pending[key] = asyncio.ensure_future(self._fetch(session, key, headers))
+        try:
+            rules = await asyncio.shield(self._pending[key])
+        finally:
+            self._pending.pop(key, None)
+        if key in self._rules:
+            return self._rules[key]  # Another waiter on the same fetch stored it already
+        if rules.unavailable:
+            failures = self._failures[key] = self._failures.get(key, 0) + 1
+            if failures >= self.max_failures:
+                logger.warning("robots.txt for %s failed %d times; treating host as disallowed", key, failures)
+                rules = RobotsRules(allow_all=False)
+            else:
+                self._expires[key] = time.monotonic() + self.failure_ttl
+        else:
+            self._failures.pop(key, None)
+        self._rules[key] = rules
+        return rules
+
+    async def _fetch(self, session: aiohttp.ClientSession, key: str, headers: Dict) -> RobotsRules:
+        robots_url = f"{key}/robots.txt"
+        try:
+            async with session.get(robots_url, headers=headers, timeout=30) as response:
+                if response.status == 200:
+                    return RobotsRules(await response.text(errors='replace'), self.user_agent)
+                if 400 <= response.status < 500:
+                    return RobotsRules()  # No robots.txt: everything is allowed
+                logger.warning("%s returned %s; holding the host back and retrying in %gs",
+                               robots_url, response.status, self.failure_ttl)
+        except Exception as e:
+            logger.warning("Could not fetch %s: %s; holding the host back and retrying in %gs",
+                           robots_url, e, self.failure_ttl)
+        # RFC 9309: an unreachable robots.txt means full disallow, until it can be fetched again
+        return RobotsRules(allow_all=False, unavailable=True)
+
+
+class AdaptiveRateLimiter:
+    """Hands out one HostController per host"""
+
+    def __init__(self, initial_concurrency: int = 2, max_concurrency: int = 32,
+                 requests_per_second: float = 10.0, min_concurrency: int = 1):
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.requests_per_second = requests_per_second
+        self.hosts = {}
+
+    def for_host(self, host: str) -> HostController:
+        controller = self.hosts.get(host)
+        if controller is None:
+            controller = HostController(self.initial_concurrency, self.min_concurrency,
+                                        self.max_concurrency, self.requests_per_second)
+            self.hosts[host] = controller
+        return controller
+
+    def snapshot(self) -> Dict:
+        """Current concurrency limit and health signals per host"""
+        return {
+            host: {
+                'limit': round(c.limit, 2),
+                'in_flight': c.in_flight,
+                'ttfb_median': c.ttfb_median,
+                'ttfb_baseline': c.ttfb_baseline,
+                'error_rate': round(c.error_ewma, 3)
+            }
+            for host, c in self.hosts.items()
+        }
+
+
+# Responses that usually mean "try again later" rather than "this page is gone"
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Transport-level failures: timeouts, refused/reset connections, truncated bodies
+RETRYABLE_EXCEPTIONS = (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+
+class RetryPolicy:
+    """Which fetch failures are retried, how often, and how long to wait before each retry"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 statuses: frozenset = RETRYABLE_STATUSES, exceptions: tuple = RETRYABLE_EXCEPTIONS):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = statuses
+        self.exceptions = exceptions
+
+    def retryable_status(self, status: int) -> bool:
+        return status in self.statuses
+
+    def retryable_exception(self, error: BaseException) -> bool:
+        return isinstance(error, self.exceptions)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff for the given retry (1-based), never sooner than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(delay, retry_after) if retry_after is not None else delay
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after consecutive failures, then lets a single probe through per cooldown
+
+    closed -> open after `failure_threshold` consecutive failures; once the
+    cooldown passes the breaker is half-open and one request probes the host.
+    A successful probe closes it, a failed one reopens it with a doubled
+    cooldown. After `max_trips` openings in a row the host is treated as down.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 600.0,
+                 max_trips: int = 6):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if not self.trips:
+            return 'closed'
+        return 'open' if time.monotonic() < self.open_until or self._probing else 'half-open'
+
+    @property
+    def dead(self) -> bool:
+        return self.trips >= self.max_trips
+
+    def allow(self) -> bool:
+        """Whether a request may go to the host now (claims the probe slot when half-open)"""
+        if not self.trips:
+            return True
+        if self.dead or self._probing or time.monotonic() < self.open_until:
+            return False
+        self._probing = True
+        return True
+
+    def retry_delay(self) -> float:
+        """How long a request turned away by allow() should wait before asking again"""
+        return max(1.0, self.open_until - time.monotonic())
+
+    def release_probe(self):
+        """Give back a probe slot whose request never reached the host"""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.trips = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (not self.trips and self.failures >= self.failure_threshold):
+            self.trips += 1
+            self.open_until = time.monotonic() + min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+            self._probing = False
+
+
+class CrawlCheckpoint:
+    """Incremental, crash-safe crawl state stored in SQLite
+
+    Changes are buffered in memory and written in one transaction per flush on a
+    dedicated thread, so the event loop never waits on disk I/O.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, priority INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS forms (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        ''')
+        self._conn.commit()
+        self._queued = []
+        self._done = []
+        self._forms = []
+        self._meta = {}
+
+    def record_queued(self, url: str, priority: float):
+        self._queued.append((url, priority))
+
+    def record_done(self, url: str):
+        self._done.append((url,))
+
+    def record_form(self, form_data: Dict):
+        self._forms.append((json.dumps(form_data),))
+
+    def set_meta(self, key: str, value):
+        self._meta[key] = json.dumps(value)
+
+    def _write(self, queued, done, forms, meta):
+        with self._conn:
+            self._conn.executemany('INSERT OR IGNORE INTO urls (url, priority) VALUES (?, ?)', queued)
+            self._conn.executemany('UPDATE urls SET done = 1 WHERE url = ?', done)
+            self._conn.executemany('INSERT INTO forms (data) VALUES (?)', forms)
+            self._conn.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', meta.items())
+
+    async def flush(self):
+        """Write everything recorded since the last flush"""
+        batch = (self._queued, self._done, self._forms, self._meta)
+        self._queued, self._done, self._forms, self._meta = [], [], [], {}
+        if any(batch):
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write, *batch)
+
+    def load(self) -> Dict:
+        """Read back the stored state: every known URL, the pending ones, forms and meta"""
+        urls = self._conn.execute('SELECT url, priority, done FROM urls').fetchall()
+        forms = [json.loads(row[0]) for row in self._conn.execute('SELECT data FROM forms ORDER BY id')]
+        meta = {key: json.loads(value) for key, value in self._conn.execute('SELECT key, value FROM meta')}
+        return {
+            'seen': [url for url, _, _ in urls],
+            'pending': [(url, priority) for url, priority, done in urls if not done],
+            'forms': forms,
+            'meta': meta
+        }
+
+    def reset(self):
+        """Forget any stored state so a fresh crawl does not merge into an old one"""
+        self._queued, self._done, self._forms, self._meta = [], [], [], {}
+        with self._conn:
+            self._conn.execute('DELETE FROM urls')
+            self._conn.execute('DELETE FROM forms')
+            self._conn.execute('DELETE FROM meta')
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+class ValidatorStore:
+    """Per-URL HTTP validators and last extraction result, kept between runs
+
+    Lets a recrawl send If-None-Match/If-Modified-Since and reuse the stored
+    forms and links on a 304 (or an unchanged body) instead of re-parsing.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='validators')
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT,
+                forms TEXT NOT NULL, links TEXT NOT NULL
+            )
+        ''')
+        self._conn.commit()
+        self._pending = []
+
+    def _read(self, url: str) -> Optional[Dict]:
+        row = self._conn.execute(
+            'SELECT etag, last_modified, content_hash, forms, links FROM pages WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash, forms, links = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': content_hash,
+            'forms': json.loads(forms),
+            'links': json.loads(links)
+        }
+
+    def _write(self, rows):
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    async def get(self, url: str) -> Optional[Dict]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._read, url)
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: str,
+              forms: list, links: list):
+        self._pending.append((url, etag, last_modified, content_hash, json.dumps(forms), json.dumps(links)))
+        if len(self._pending) >= self.flush_every:
+            self._submit()
+
+    def _submit(self):
+        rows, self._pending = self._pending, []
+        if rows:
+            # The single worker thread keeps writes ordered; nothing on the loop waits for them
+            self._executor.submit(self._write, rows)
+
+    def close(self):
+        self._submit()
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+FORM_CSV_HEADER = [
+    'Form ID', 'URL', 'Form Selector', 'Success Message Selector', 'Fields',
+    'Form Type', 'Has Meta Description', 'Meta Description',
+    'Has Meta Keywords', 'Meta Keywords', 'SEO Issues', 'Site'
+]
+
+
+def form_to_row(form: Dict) -> list:
+    """Flatten a form record into the FORM_CSV_HEADER column layout"""
+    fields_str = ';'.join([
+        f"{field['selector']}|{field['type']}|{'required' if field['required'] else 'optional'}"
+        for field in form['fields']
+    ])
+    meta = form.get('meta_info', {})
+    return [
+        form['form_id'],
+        form['url'],
+        form['form_selector'],
+        '.success-message',  # Default success message selector
+        fields_str,
+        form['form_type'],
+        meta.get('has_meta_description', False),
+        meta.get('meta_description', '')[:200],  # Truncate long descriptions
+        meta.get('has_meta_keywords', False),
+        meta.get('meta_keywords', '')[:200],  # Truncate long keywords
+        '; '.join(meta.get('seo_issues', [])),
+        form.get('site', '')
+    ]
+
+
+def form_signature(form: Dict) -> bytes:
+    """Canonical identity of a form: URL, form selector and field schema
+
+    Hashed to a 16-byte digest so the dedupe index costs the same per form no
+    matter how many fields or how much meta text the form carries.
+    """
+    schema = '\x1f'.join(
+        f"{field['selector']}|{field['type']}|{int(bool(field['required']))}" for field in form['fields']
+    )
+    canonical = '\x1e'.join((form['url'], form['form_selector'], schema))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest()
+
+
+class FormSink:
+    """Streams form records to CSV or JSONL as they are discovered
+
+    Rows go through a buffered file and are flushed every `flush_every` rows
+    (and on flush()/close()), so nothing accumulates in memory.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None, append: bool = False, flush_every: int = 50):
+        self.path = path
+        self.format = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if self.format not in ('csv', 'jsonl'):
+            raise ValueError(f"Unsupported output format: {self.format}")
+        self.flush_every = flush_every
+        self.count = 0
+        self._unflushed = 0
+
+        append = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8', buffering=64 * 1024)
+        self._writer = csv.writer(self._file) if self.format == 'csv' else None
+        if self._writer and not append:
+            self._writer.writerow(FORM_CSV_HEADER)
+
+    def write(self, form: Dict):
+        row = form_to_row(form)
+        if self._writer:
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(dict(zip(FORM_CSV_HEADER, row))) + '\n')
+        self.count += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._unflushed = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+# Histogram bucket upper bounds in seconds, shared by every stage so snapshots line up
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (Prometheus-style) with count, sum and max"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside the bucket that holds it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max
+        }
+
+
+class _StageTimer:
+    """Context manager adding the elapsed time of its block to one stage"""
+
+    __slots__ = ('timings', 'stage', 'started')
+
+    def __init__(self, timings: 'StageTimings', stage: str):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class StageTimings:
+    """Latency histograms per crawl stage (dns, connect, ttfb, download, parse, meta, forms, links, ...)"""
+
+    def __init__(self):
+        self.histograms = {}
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def time(self, stage: str) -> _StageTimer:
+        return _StageTimer(self, stage)
+
+    def snapshot(self) -> Dict:
+        return {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+
+    def prometheus_text(self, prefix: str = 'formcrawler') -> str:
+        """Render the histograms in the Prometheus text exposition format"""
+        name = f"{prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent in each crawl stage", f"# TYPE {name} histogram"]
+        for stage, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str, prefix: str = 'formcrawler'):
+        """Atomically replace path with the current histograms (for a textfile collector)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text(prefix))
+        os.replace(tmp_path, path)
+
+
+# Per-process crawler used by parse workers; set up once by _init_parse_worker
+_worker_crawler = None
+
+
+def _init_parse_worker(sites: list, parser: str, form_configs: Dict, canonicalizer: UrlCanonicalizer):
+    global _worker_crawler
+    # No event loop to protect here, and pool workers exit without flushing a listener
+    _restart_logging_in_child(background=False)
+    _worker_crawler = WebCrawler(sites, parser=parser, output_path=None, canonicalizer=canonicalizer)
+    _worker_crawler.form_configs = form_configs
+    _worker_crawler.compile_form_configs()
+
+
+def _parse_in_worker(url: str, body: bytes, encoding: str) -> PageResult:
+    """Process-pool entry point for the crawler: raw bytes in, compact PageResult out"""
+    return _worker_crawler.extract(url, body.decode(encoding, 'replace'))
+
+
+def _extract_in_worker(page: tuple) -> PageResult:
+    """Process-pool entry point for extract_many"""
+    url, html = page
+    return _worker_crawler.extract(url, html)
+
+
 class WebCrawler:
-    def __init__(self, base_url: str, batch_size: int = 5, max_pages: int = 500, timeout_minutes: int = 30):
-        self.base_url = self._normalize_url(base_url)
-        self.visited = set()
-        self.queue = []
+    def __init__(self, base_url, max_pages: int = 500, timeout_minutes: int = 30,
+                 initial_concurrency: int = 2, max_concurrency: int = 32, requests_per_second: float = 10.0,
+                 conn_limit: int = 100, conn_limit_per_host: int = 10, keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300, checkpoint_path: Optional[str] = None, resume: bool = False,
+                 checkpoint_interval: float = 5.0, validator_cache_path: Optional[str] = None,
+                 output_path: Optional[str] = 'form_specs.csv', output_format: Optional[str] = None,
+                 keep_forms: bool = False, parser: str = 'auto', parse_workers: int = 0,
+                 seen_store: str = 'set', expected_urls: int = 1_000_000,
+                 canonicalizer: Optional[UrlCanonicalizer] = None, max_body_bytes: int = 5 * 1024 * 1024,
+                 stop_at_body_end: bool = False, stop_when_forms_found: bool = False, head_probe: bool = False,
+                 seed_sitemaps: bool = False, obey_robots: bool = True, robots_user_agent: str = 'FormCrawler',
+                 metrics_path: Optional[str] = None, metrics_interval: float = 15.0,
+                 retry_policy: Optional[RetryPolicy] = None, breaker_threshold: int = 5,
+                 breaker_cooldown: float = 30.0):
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        # base_url is one site or a list of sites; a site is a base URL or a dict with
+        # base_url and optional max_pages, timeout_minutes and weight overrides
+        self.site_specs = [base_url] if isinstance(base_url, (str, dict)) else list(base_url)
+        self.sites = [self._make_site(spec, max_pages, timeout_minutes) for spec in self.site_specs]
+        if not self.sites:
+            raise ValueError("At least one site is required")
+        self.base_url = self.sites[0].base_url
+        # Send the agent robots.txt groups are matched against, so the rules applied are the ones meant for us
+        self.request_headers = {
+            'User-Agent': f'Mozilla/5.0 (compatible; {robots_user_agent})'
+        }
+        # visited/all_urls only need membership tests, so they can be compact (see make_seen_set)
+        self.visited = make_seen_set(seen_store, expected_urls)
+        self.queue = SiteFrontier(self.sites, self._host_delay)
         self.forms_found = []
-        self.batch_size = batch_size
+        # Workers are capped at max_concurrency; per-host AIMD decides how many are actually fetching,
+        # never more than the pool will open to one host (beyond that requests only queue for a connection)
+        self.max_concurrency = max_concurrency
+        host_concurrency = min(max_concurrency, conn_limit_per_host) if conn_limit_per_host else max_concurrency
+        self.rate_limiter = AdaptiveRateLimiter(min(initial_concurrency, host_concurrency), host_concurrency,
+                                                requests_per_second)
+        # Defaults for sites without their own budget; the crawl as a whole ends when every
+        # site is out of budget, or after the longest site timeout
         self.max_pages = max_pages
-        self.timeout_minutes = timeout_minutes
-        self.all_urls = set()
+        self.timeout_minutes = max(site.timeout_minutes for site in self.sites)
+        self.all_urls = make_seen_set(seen_store, expected_urls)
         self.start_time = None
+        self._frontier_cond = None
+        self._in_flight = 0
+        self._pages_done = 0
+
+        # Shared connection pool settings (one connector serves crawl() and get_session())
+        self.conn_limit = conn_limit
+        self.conn_limit_per_host = conn_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._ssl_context = ssl.create_default_context()
+        self._connector = None
+        self._sessions = set()  # Sessions handed out by get_session(); they keep the pool open
+        self._conn_stats = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0
+        }
+
+        # Optional SQLite checkpoint for crash recovery
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint = None
+
+        # Optional cross-run store of ETag/Last-Modified validators for conditional GETs
+        self.validator_cache_path = validator_cache_path
+        self.validator_cache = None
+        self._cache_stats = {'not_modified': 0, 'unchanged_body': 0, 'parsed': 0}
+
+        # Forms are streamed to output_path as they are found; forms_found is only
+        # populated when keep_forms is set (or there is no output_path)
+        self.output_path = output_path
+        self.output_format = output_format
+        self.keep_forms = keep_forms or not output_path
+        self.sink = None
+        self.forms_count = 0
+        self._form_signatures = set()
+
+        # HTML parser backend shared by _process_url and _extract_form_info
+        self.parser = available_parsers()[0] if parser == 'auto' else parser
+        self._parse = get_parser(self.parser)
+
+        # parse_workers > 0 moves parsing/extraction off the event loop into a process pool
+        self.parse_workers = parse_workers
+        self._parse_pool = None
+
+        # Body download budget and early-termination switches (see _read_body).
+        # stop_when_forms_found trades links further down the page for bandwidth.
+        self.max_body_bytes = max_body_bytes
+        self.stop_at_body_end = stop_at_body_end
+        self.stop_when_forms_found = stop_when_forms_found
+        self._body_stats = {'pages': 0, 'bytes': 0, 'truncated': 0, 'stopped_early': 0}
+
+        # Seed the frontier from robots.txt/sitemap.xml before link-following starts
+        self.seed_sitemaps = seed_sitemaps
+
+        # robots.txt: fetched once per host, checked for every URL and discovered link
+        self.obey_robots = obey_robots
+        self.robots = RobotsCache(robots_user_agent)
+        self._crawl_delay_applied = set()
+        self._robots_blocked = 0
+
+        # Content-Type filtering: learned per path pattern, optionally HEAD-probed first
+        self.head_probe = head_probe
+        self.content_types = ContentTypeCache()
+
+        # Per-stage latency histograms; metrics_path receives them in Prometheus text format
+        self.timings = StageTimings()
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+
+        # Transient failures are retried after a jittered backoff by re-queueing through the
+        # frontier; a per-host circuit breaker holds back requests to origins that look down
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._breakers = {}
+        self._retry_attempts = {}  # url -> failed attempts so far, while a retry is still possible
+        self._retry_heap = []  # (due monotonic time, seq, url) waiting to go back on the frontier
+        self._retry_due = set()  # URLs currently in _retry_heap
+        self._retry_counter = itertools.count()
+        self._retry_wakeup = None
+        self._retry_stats = {'retried': 0, 'gave_up': 0, 'deferred_by_breaker': 0, 'dropped_by_breaker': 0,
+                             'deferred_by_robots': 0}
 
         # Known form paths and their expected IDs/classes
         self.form_configs = {
-            '/': {'name': 'Get Free Recommendations', 'selectors': ['form#home-recommendations']},
+            '/': {'name': 'Get Free Recommendations', 'match': 'exact', 'selectors': ['form#home-recommendations']},
             'vendor-profile-page-software': {
                 'name': 'Software Profile Forms',
                 'selectors': [
@@ -72,27 +1887,73 @@ class WebCrawler:
             },
             'contact-us': {'name': 'Contact Form', 'selectors': ['form.contact-form']}
         }
+        self.compile_form_configs()
+
+    def compile_form_configs(self):
+        """(Re)build the URL matcher; call again after changing form_configs"""
+        self._config_matcher = FormConfigMatcher(self.form_configs)
+        # One compiled SelectorSet per combination of configs a URL can match;
+        # single configs are compiled up front, combinations on first use
+        self._selector_sets = {}
+        for key, config in self.form_configs.items():
+            self._selector_set([(key, config)])
+
+    def _selector_set(self, configs: list) -> SelectorSet:
+        cache_key = tuple(key for key, _ in configs)
+        selector_set = self._selector_sets.get(cache_key)
+        if selector_set is None:
+            selector_set = SelectorSet([selector for _, config in configs for selector in config['selectors']])
+            self._selector_sets[cache_key] = selector_set
+        return selector_set
+
+    def _make_site(self, spec, max_pages: int, timeout_minutes: float) -> CrawlSite:
+        if isinstance(spec, str):
+            spec = {'base_url': spec}
+        return CrawlSite(
+            self._normalize_url(spec['base_url']),
+            max_pages=spec.get('max_pages', max_pages),
+            timeout_minutes=spec.get('timeout_minutes', timeout_minutes),
+            weight=spec.get('weight', 1.0)
+        )
+
+    def site_for(self, url: str) -> Optional[CrawlSite]:
+        """The configured site a canonical URL belongs to, or None if it is out of scope"""
+        return self.queue.site_for(url)
+
+    def site_stats(self) -> Dict:
+        """Per-site counters keyed by base URL"""
+        return {site.base_url: site.stats() for site in self.sites}
+
+    def _admit(self, url: str) -> bool:
+        """Count a new URL against its site; False if it is out of scope or the site is out of budget"""
+        site = self.site_for(url)
+        if site is None or site.exhausted():
+            return False
+        site.queued += 1
+        return True
 
     def _normalize_url(self, url: str) -> str:
-        """Normalize URL to prevent duplicates"""
-        parsed = urlparse(url)
-        clean_path = re.sub(r'/+', '/', parsed.path.rstrip('/'))
-        return f"{parsed.scheme}://{parsed.netloc.lower()}{clean_path}"
+        """Normalize URL to prevent duplicates (see UrlCanonicalizer)"""
+        return self.canonicalizer.canonicalize(url)
+
+    def _url_priority(self, url: str) -> int:
+        """Frontier priority for a URL: form-bearing paths (0) come out before everything else (1)"""
+        return 0 if self._config_matcher.match(url) else 1
 
     def _should_crawl_url(self, url: str) -> bool:
         """Filter URLs to crawl with priority for form-related paths"""
         parsed = urlparse(url)
         path = parsed.path.lower()
 
-        # Skip non-HTML resources
-        if any(ext in path for ext in [
-            '.jpg', '.jpeg', '.png', '.gif', '.pdf', '.zip', '.css', '.js',
-            '.ico', '.xml', '.txt', '.doc', '.docx', '.xls', '.xlsx'
-        ]):
+        # Skip obvious non-HTML resources by their real extension; anything else is
+        # settled by the Content-Type header before the body is read
+        if url_extension(url) in NON_HTML_EXTENSIONS:
             return False
 
-        # Skip certain patterns that indicate duplicate content
-        if any(pattern in path for pattern in [
+        # Skip certain patterns that indicate duplicate content (queries now survive
+        # canonicalization, so the paging parameters are checked there too)
+        path_and_query = f"{path}?{parsed.query.lower()}"
+        if any(pattern in path_and_query for pattern in [
             '/feed/', '/rss/', '/atom/', '/api/',
             '/print/', '/trackback/',
             'offset=', 'limit=', 'start='
@@ -100,14 +1961,14 @@ class WebCrawler:
             return False
 
         # Prioritize paths that might contain forms
-        if any(form_path in path for form_path in self.form_configs.keys()):
-            logger.debug(f"Found potential form page: {url}")
+        if self._config_matcher.match(url):
+            logger.debug("Found potential form page: %s", url)
             return True
 
         # Allow other HTML pages but with lower priority
         return True
 
-    def _extract_meta_info(self, soup, url: str) -> Dict:
+    def _extract_meta_info(self, doc, url: str) -> Dict:
         """Extract and analyze meta tag information"""
         meta_info = {
             'url': url,
@@ -119,9 +1980,9 @@ class WebCrawler:
         }
 
         # Check meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            content = meta_desc.get('content', '').strip()
+        meta_desc = doc.meta_content('description')
+        if meta_desc is not None:
+            content = meta_desc.strip()
             if content:
                 meta_info['has_meta_description'] = True
                 meta_info['meta_description'] = content
@@ -131,9 +1992,9 @@ class WebCrawler:
             meta_info['seo_issues'].append("Missing meta description")
 
         # Check meta keywords
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-        if meta_keywords:
-            content = meta_keywords.get('content', '').strip()
+        meta_keywords = doc.meta_content('keywords')
+        if meta_keywords is not None:
+            content = meta_keywords.strip()
             if content:
                 meta_info['has_meta_keywords'] = True
                 meta_info['meta_keywords'] = content
@@ -142,233 +2003,1190 @@ class WebCrawler:
         else:
             meta_info['seo_issues'].append("Missing meta keywords")
 
-        # Log findings
-        logger.info(f"Meta analysis for {url}:")
-        logger.info(f"- Description present: {meta_info['has_meta_description']}")
-        logger.info(f"- Keywords present: {meta_info['has_meta_keywords']}")
-        if meta_info['seo_issues']:
-            logger.warning(f"SEO issues found: {', '.join(meta_info['seo_issues'])}")
-
+        self._log_meta_info(url, meta_info)
         return meta_info
 
+    def _log_meta_info(self, url: str, meta_info: Dict):
+        # One debug line per page; the issues also end up in the SEO Issues column
+        logger.debug("Meta analysis for %s: description=%s keywords=%s issues=%s", url,
+                     meta_info['has_meta_description'], meta_info['has_meta_keywords'], meta_info['seo_issues'])
+
+    def _extract_fields(self, form: FormNode) -> list:
+        """Visible fields of a matched form (hidden and submit inputs are skipped)"""
+        fields = []
+        for tag, attrs in form.fields:
+            field_type = attrs.get('type', 'text') if tag == 'input' else tag
+            field_name = attrs.get('name', '')
+            required = 'required' in attrs or 'data-required' in attrs
+
+            # Skip hidden and submit fields
+            if field_type not in ['hidden', 'submit']:
+                fields.append({
+                    'selector': f"{tag}[name='{field_name}']",
+                    'type': field_type,
+                    'required': required
+                })
+        return fields
+
     def _extract_form_info(self, url: str, html: str) -> list:
         """Extract form information from HTML"""
+        try:
+            return self.extract(url, html).forms
+        except Exception as e:
+            logger.error("Error extracting form info from %s: %s", url, e)
+            return []
+
+    def extract(self, url: str, html) -> PageResult:
+        """Extract forms, meta info and crawlable links from a page's HTML (str or bytes)
+
+        Pure and network-free: used by the crawler itself, by parse worker
+        processes and for reprocessing stored HTML.
+        """
+        # Extract meta information and forms
+        with self.timings.time('parse'):
+            doc = self._parse(html)
+        with self.timings.time('meta'):
+            meta_info = self._extract_meta_info(doc, url)
+
         forms = []
-        meta_info = None
+        site = self.site_for(url)
+        configs = self._config_matcher.match(url)
+        with self.timings.time('forms'):
+            matches = doc.select_first(self._selector_set(configs))
+        # Check each path configuration
+        for path, config in configs:
+            logger.debug("Checking for %s forms at %s", config['name'], url)
 
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # First analyze meta tags
-            meta_info = self._extract_meta_info(soup, url)
-
-            # Check each path configuration
-            for path, config in self.form_configs.items():
-                if path in url or path == '/':
-                    logger.debug(f"Checking for {config['name']} forms at {url}")
-
-                    for selector in config['selectors']:
-                        form = soup.select_one(selector)
-                        if form:
-                            logger.info(f"Found {config['name']} form using selector: {selector}")
-
-                            # Extract form fields
-                            fields = []
-                            for field in form.find_all(['input', 'textarea', 'select']):
-                                field_type = field.get('type', 'text') if field.name == 'input' else field.name
-                                field_name = field.get('name', '')
-                                required = field.has_attr('required') or field.has_attr('data-required')
-
-                                # Skip hidden and submit fields
-                                if field_type not in ['hidden', 'submit']:
-                                    field_data = {
-                                        'selector': f"{field.name}[name='{field_name}']",
-                                        'type': field_type,
-                                        'required': required
-                                    }
-                                    fields.append(field_data)
-
-                            if fields:  # Only include forms with visible input fields
-                                form_data = {
-                                    'url': url,
-                                    'form_id': form.get('id', '') or selector.replace('form', '').strip('.#'),
-                                    'form_selector': selector,
-                                    'form_type': config['name'],
-                                    'fields': fields,
-                                    'meta_info': meta_info  # Include meta tag analysis with each form
-                                }
-                                forms.append(form_data)
-                                logger.info(f"Added form data for {form_data['form_id']} with {len(fields)} fields")
+            for selector in config['selectors']:
+                form = matches.get(selector)
+                if form:
+                    logger.info("Found %s form using selector: %s", config['name'], selector)
 
-        except Exception as e:
-            logger.error(f"Error extracting form info from {url}: {e}")
+                    # Extract form fields
+                    fields = self._extract_fields(form)
+
+                    if fields:  # Only include forms with visible input fields
+                        form_data = {
+                            'url': url,
+                            'form_id': form.attrs.get('id', '') or selector.replace('form', '').strip('.#'),
+                            'form_selector': selector,
+                            'form_type': config['name'],
+                            'fields': fields,
+                            'meta_info': meta_info,  # Include meta tag analysis
+                            'site': site.base_url if site else ''
+                        }
+                        forms.append(form_data)
+                        logger.info("Added form data for %s with %d fields", form_data['form_id'], len(fields))
+
+        # Extract new URLs to crawl
+        links_started = time.perf_counter()
+        page_links = []
+        for href in doc.links():
+            if not href or href.startswith('#') or href.startswith('mailto:'):
+                continue
+
+            try:
+                full_url = urljoin(url, href)
+                normalized_url = self._normalize_url(full_url)
+                if (self.site_for(normalized_url) is not None and
+                    self._should_crawl_url(full_url)):
+                    page_links.append(normalized_url)
+            except Exception as e:
+                logger.warning("Error processing link %s: %s", href, e)
+        self.timings.observe('links', time.perf_counter() - links_started)
+
+        return PageResult(url, forms, meta_info, page_links)
+
+    def extract_many(self, pages: Iterable, workers: Optional[int] = None, chunksize: int = 16) -> Iterator[PageResult]:
+        """extract() over an iterable of (url, html) pairs, yielding PageResults in input order
+
+        workers=None uses every core, workers=1 runs in this process. Input is
+        consumed in bounded windows so arbitrarily large corpora can be streamed.
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for url, html in pages:
+                yield self.extract(url, html)
+            return
+
+        pages = iter(pages)
+        window = workers * chunksize * 4
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker,
+                                 initargs=(self.site_specs, self.parser, self.form_configs, self.canonicalizer)) as pool:
+            while True:
+                batch = list(itertools.islice(pages, window))
+                if not batch:
+                    break
+                yield from pool.map(_extract_in_worker, batch, chunksize=chunksize)
+
+    def _enqueue(self, url: str, priority: float):
+        """Put a URL on the frontier and mark it as seen"""
+        if not self._admit(url):
+            return
+        self.queue.push(url, priority)
+        self.visited.add(url)
+        self.all_urls.add(url)
+        if self.checkpoint:
+            self.checkpoint.record_queued(url, priority)
+
+    def _sitemap_priority(self, url: str, lastmod: Optional[str]) -> float:
+        """Usual frontier priority, nudged so recently modified pages come out first within it"""
+        age_days = 365
+        if lastmod:
+            try:
+                modified = datetime.fromisoformat(lastmod.strip().replace('Z', '+00:00'))
+                if modified.tzinfo is None:
+                    modified = modified.replace(tzinfo=timezone.utc)
+                age_days = min(365, max(0, (datetime.now(timezone.utc) - modified).days))
+            except ValueError:
+                pass
+        return self._url_priority(url) + age_days / 366
+
+    async def _sitemap_urls_from_robots(self, session: aiohttp.ClientSession, site: CrawlSite) -> list:
+        """Sitemap: directives from robots.txt, falling back to /sitemap.xml"""
+        rules = await self._robots_rules(session, site.base_url)
+        return list(rules.sitemaps) or [urljoin(site.base_url + '/', '/sitemap.xml')]
 
-        return forms
+    async def _robots_rules(self, session: aiohttp.ClientSession, url: str) -> RobotsRules:
+        """Cached robots.txt rules for url's host; a Crawl-delay is applied to the host's pacing once"""
+        if not self.obey_robots:
+            return RobotsRules()
+        cached = self.robots.cached(url)
+        if cached is not None:
+            return cached
+        rules = await self.robots.rules_for(session, url, self.request_headers)
+        host = urlparse(url).netloc
+        if rules.crawl_delay and host not in self._crawl_delay_applied:
+            self._crawl_delay_applied.add(host)
+            self._apply_crawl_delay(host, rules.crawl_delay)
+        return rules
+
+    def _apply_crawl_delay(self, host: str, delay: float):
+        self.rate_limiter.for_host(host).set_crawl_delay(delay)
+        logger.info("Applying Crawl-delay %ss to %s", delay, host)
+
+    async def _iter_sitemap(self, session: aiohttp.ClientSession, sitemap_url: str):
+        """Stream (kind, loc, lastmod) entries out of a (possibly gzipped) sitemap or sitemap index
+
+        The XML is fed chunk by chunk to a pull parser and processed elements are
+        dropped, so memory stays flat however many URLs the sitemap lists.
+        """
+        async with session.get(sitemap_url, headers=self.request_headers, timeout=60) as response:
+            if response.status != 200:
+                logger.warning("Failed to fetch sitemap %s: Status %s", sitemap_url, response.status)
+                return
+            gzipped = sitemap_url.endswith('.gz') or response.content_type in ('application/gzip', 'application/x-gzip')
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+            parser = ElementTree.XMLPullParser(events=('start', 'end'))
+            root = None
+            entry = {}
+
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+                for event, element in parser.read_events():
+                    tag = element.tag.rsplit('}', 1)[-1]
+                    if event == 'start':
+                        if root is None:
+                            root = element
+                        continue
+                    if tag in ('loc', 'lastmod'):
+                        entry[tag] = (element.text or '').strip()
+                    elif tag in ('url', 'sitemap'):
+                        if entry.get('loc'):
+                            yield tag, entry['loc'], entry.get('lastmod')
+                        entry = {}
+                        root.clear()  # Everything up to this element has been handled
+            parser.close()
+
+    async def _seed_from_sitemaps(self, session: aiohttp.ClientSession, site: CrawlSite, max_depth: int = 3):
+        """Seed a site's frontier from its robots.txt sitemaps and the sitemap indexes they point to"""
+        pending = [(url, 0) for url in await self._sitemap_urls_from_robots(session, site)]
+        seen_sitemaps = set()
+        seeded = 0
+        # Capped separately from the fetch budget: more than max_pages seeds could never be fetched anyway
+        while pending and site.queued < site.max_pages:
+            sitemap_url, depth = pending.pop()
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+            try:
+                async for kind, loc, lastmod in self._iter_sitemap(session, sitemap_url):
+                    if kind == 'sitemap':
+                        if depth < max_depth:
+                            pending.append((loc, depth + 1))
+                        continue
+                    url = self._normalize_url(loc)
+                    if (site.in_scope(url) and self._should_crawl_url(url)
+                            and url not in self.all_urls
+                            and (not self.obey_robots or self.robots.allowed(url))):
+                        self._enqueue(url, self._sitemap_priority(url, lastmod))
+                        seeded += 1
+                        if site.queued >= site.max_pages:
+                            break
+            except Exception as e:
+                logger.warning("Error reading sitemap %s: %s", sitemap_url, e)
+        logger.info("Seeded %d URLs for %s from %d sitemaps", seeded, site.base_url, len(seen_sitemaps))
+
+    async def _probe_is_html(self, session: aiohttp.ClientSession, url: str, headers: Dict) -> Tuple[bool, Optional[int]]:
+        """HEAD a URL whose extension is not a usual HTML one; returns (serves HTML, HEAD status)"""
+        try:
+            async with session.head(url, headers=headers, timeout=30, allow_redirects=True) as response:
+                if response.status != 200:
+                    return True, response.status  # Inconclusive; let the GET decide
+                return is_html_response(response), response.status
+        except Exception as e:
+            logger.debug("HEAD probe failed for %s: %s", url, e)
+            return True, None
 
     async def _process_url(self, session: aiohttp.ClientSession, url: str):
         """Process a single URL to find forms and analyze meta tags"""
+        if self.content_types.known_non_html(url):
+            logger.debug("Skipping %s: path pattern is known not to serve HTML", url)
+            return []
+        if self.obey_robots:
+            rules = await self._robots_rules(session, url)
+            if rules.unavailable:
+                # Hold the URL back until robots.txt is fetched again rather than dropping it
+                self._retry_stats['deferred_by_robots'] += 1
+                self._schedule_retry(url, self.robots.retry_delay(url))
+                return []
+            if not self.robots.allowed(url):
+                logger.debug("Skipping %s: disallowed by robots.txt", url)
+                self._robots_blocked += 1
+                return []
+
+        host_name = urlparse(url).netloc
+        breaker = self._breaker_for(host_name)
+        if not breaker.allow():
+            self._defer_for_breaker(url, host_name, breaker)
+            return []
+
+        host = self.rate_limiter.for_host(host_name)
+        site = self.site_for(url)
+        status = ttfb = retry_after = None
+        failure = None  # Set when the fetch failed in a way worth retrying
+        acquired = fetched = False
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            async with session.get(url, headers=headers, timeout=30) as response:
+            # Inside the try: a worker cancelled while waiting must still hand back a half-open probe
+            with self.timings.time('throttle'):
+                acquired = await host.acquire(site.deadline if site else None)
+            if not acquired:
+                logger.debug("Dropping %s: the site's time budget ran out while waiting for %s", url, host_name)
+                return []
+            headers = dict(self.request_headers)
+            if (self.head_probe and url_extension(url) not in HTML_EXTENSIONS
+                    and not self.content_types.known_html(url)):
+                is_html, head_status = await self._probe_is_html(session, url, headers)
+                if not is_html:
+                    logger.debug("Skipping %s: HEAD says it is not HTML", url)
+                    self.content_types.record(url, is_html=False)
+                    status = head_status  # A healthy answer; without it the controller would count a failure
+                    return []
+            cached = await self.validator_cache.get(url) if self.validator_cache else None
+            if cached:
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+
+            # The trace fills in 'ttfb' from the moment a pooled connection was ready,
+            # so time spent queueing for one does not read as a slow server
+            request_timing = {}
+            async with session.get(url, headers=headers, timeout=30, trace_request_ctx=request_timing) as response:
+                status = response.status
+                ttfb = request_timing.get('ttfb')
+                fetched = True
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status == 304 and cached:
+                    logger.debug("Not modified: %s", url)
+                    self._cache_stats['not_modified'] += 1
+                    return self._reuse_cached_result(cached)
                 if response.status != 200:
-                    logger.warning(f"Failed to fetch {url}: Status {response.status}")
+                    if self.retry_policy.retryable_status(response.status):
+                        failure = f"status {response.status}"
+                    else:
+                        logger.warning("Failed to fetch %s: Status %s", url, response.status,
+                                       extra={'url': url, 'status': response.status})
+                    return []
+                html_response = is_html_response(response)
+                self.content_types.record(url, html_response)
+                if not html_response:
+                    # Leaving the context without reading drops the body unread
+                    logger.debug("Skipping %s: Content-Type %s", url, response.content_type)
                     return []
 
-                html = await response.text()
-                logger.debug(f"Got HTML response for {url} (length: {len(html)})")
-
-                # Extract meta information and forms
-                soup = BeautifulSoup(html, 'html.parser')
-                meta_info = self._extract_meta_info(soup, url)
-
-                forms = []
-                # Check each path configuration
-                for path, config in self.form_configs.items():
-                    if path in url or path == '/':
-                        logger.debug(f"Checking for {config['name']} forms at {url}")
-
-                        for selector in config['selectors']:
-                            form = soup.select_one(selector)
-                            if form:
-                                logger.info(f"Found {config['name']} form using selector: {selector}")
-
-                                # Extract form fields
-                                fields = []
-                                for field in form.find_all(['input', 'textarea', 'select']):
-                                    field_type = field.get('type', 'text') if field.name == 'input' else field.name
-                                    field_name = field.get('name', '')
-                                    required = field.has_attr('required') or field.has_attr('data-required')
-
-                                    # Skip hidden and submit fields
-                                    if field_type not in ['hidden', 'submit']:
-                                        field_data = {
-                                            'selector': f"{field.name}[name='{field_name}']",
-                                            'type': field_type,
-                                            'required': required
-                                        }
-                                        fields.append(field_data)
-
-                                if fields:  # Only include forms with visible input fields
-                                    form_data = {
-                                        'url': url,
-                                        'form_id': form.get('id', '') or selector.replace('form', '').strip('.#'),
-                                        'form_selector': selector,
-                                        'form_type': config['name'],
-                                        'fields': fields,
-                                        'meta_info': meta_info  # Include meta tag analysis
-                                    }
-                                    forms.append(form_data)
-                                    if form_data not in self.forms_found:
-                                        self.forms_found.append(form_data)
-                                    logger.info(f"Added form data for {form_data['form_id']} with {len(fields)} fields")
-
-                # Extract new URLs to crawl
-                new_urls = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if not href or href.startswith('#') or href.startswith('mailto:'):
-                        continue
+                body = await self._read_body(response, url)
+                # The body is streamed, so aiohttp cannot sniff a missing charset for us
+                encoding = response.charset or 'utf-8'
+                logger.debug("Got HTML response for %s (length: %d)", url, len(body))
 
-                    try:
-                        full_url = urljoin(url, href)
-                        normalized_url = self._normalize_url(full_url)
-                        if (normalized_url.startswith(self.base_url) and 
-                            self._should_crawl_url(full_url) and 
-                            normalized_url not in self.all_urls):
-                            # Prioritize form-related URLs
-                            if any(form_path in normalized_url.lower() for form_path in self.form_configs.keys()):
-                                new_urls.insert(0, normalized_url)
-                            else:
-                                new_urls.append(normalized_url)
-                            self.all_urls.add(normalized_url)
-                    except Exception as e:
-                        logger.warning(f"Error processing link {href}: {str(e)}")
-
-                return new_urls
+                content_hash = hashlib.sha1(body).hexdigest()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if cached and cached['content_hash'] == content_hash:
+                    # Origin ignored the validators but the page is byte-identical
+                    self._cache_stats['unchanged_body'] += 1
+                    self.validator_cache.store(url, etag, last_modified, content_hash,
+                                               cached['forms'], cached['links'])
+                    return self._reuse_cached_result(cached)
+                self._cache_stats['parsed'] += 1
+
+                # 'extract' covers the whole step; with parse_workers the per-stage
+                # timers run in the worker processes and only this one is kept
+                with self.timings.time('extract'):
+                    if self._parse_pool:
+                        page = await asyncio.get_running_loop().run_in_executor(
+                            self._parse_pool, _parse_in_worker, url, body, encoding
+                        )
+                    else:
+                        page = self.extract(url, body.decode(encoding, 'replace'))
+                forms, page_links = page.forms, page.links
+                for form_data in forms:
+                    self._add_form(form_data)
+
+                if self.validator_cache:
+                    self.validator_cache.store(url, etag, last_modified, content_hash, forms, page_links)
+
+                return self._register_links(page_links)
 
         except Exception as e:
-            logger.error(f"Error processing {url}: {str(e)}")
+            if self.retry_policy.retryable_exception(e):
+                failure = f"{type(e).__name__}: {e}"
+            else:
+                logger.error("Error processing %s: %s", url, e, extra={'url': url})
             return []
+        finally:
+            if acquired:
+                host.release(status, ttfb, retry_after)
+            self._record_outcome(url, breaker, status, failure, retry_after)
+            if fetched and url not in self._retry_due:
+                self._count_fetched(site)
+
+    def _count_fetched(self, site: Optional[CrawlSite]):
+        """Charge a completed fetch to the crawl and its site; skipped, deferred and retried URLs are not counted"""
+        self._pages_done += 1
+        if site:
+            site.pages_done += 1
+        if self._pages_done % self.max_concurrency == 0:
+            logger.info("Fetched %d pages, %d queued", self._pages_done, len(self.queue))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Host limits: %s", self.rate_limiter.snapshot())
+
+    def _breaker_for(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+        return breaker
+
+    def _record_outcome(self, url: str, breaker: CircuitBreaker, status: Optional[int], failure: Optional[str],
+                        retry_after: Optional[float]):
+        """Feed a fetch result to the host's breaker and schedule a retry if it failed transiently"""
+        if failure is None:
+            if status is not None:
+                breaker.record_success()
+                self._retry_attempts.pop(url, None)
+            else:
+                breaker.release_probe()  # Never reached the origin (skipped, or a non-network error)
+            return
+        if status is None or status >= 500:
+            was_open = breaker.trips
+            breaker.record_failure()
+            if breaker.trips > was_open:
+                host = urlparse(url).netloc
+                if breaker.dead:
+                    logger.warning("Circuit for %s opened %d times in a row; treating the host as down",
+                                   host, breaker.trips, extra={'host': host})
+                else:
+                    logger.warning("Circuit opened for %s (%d consecutive failures, trip %d of %d); pausing for %.1fs",
+                                   host, breaker.failures, breaker.trips, breaker.max_trips,
+                                   breaker.open_until - time.monotonic(), extra={'host': host})
+        else:
+            breaker.record_success()  # 408/425/429: the origin is up, just busy
+
+        attempt = self._retry_attempts.get(url, 0) + 1
+        if attempt > self.retry_policy.max_retries:
+            self._retry_attempts.pop(url, None)
+            self._retry_stats['gave_up'] += 1
+            logger.warning("Giving up on %s after %d attempts (%s)", url, attempt, failure,
+                           extra={'url': url, 'status': status})
+            return
+        self._retry_attempts[url] = attempt
+        self._retry_stats['retried'] += 1
+        delay = self.retry_policy.delay(attempt, retry_after)
+        logger.info("Retrying %s in %.1fs (attempt %d of %d): %s", url, delay, attempt,
+                    self.retry_policy.max_retries, failure)
+        self._schedule_retry(url, delay)
+
+    def _defer_for_breaker(self, url: str, host: str, breaker: CircuitBreaker):
+        """Put a URL for a host with an open circuit back until the breaker may let it through"""
+        if breaker.dead:
+            self._retry_attempts.pop(url, None)
+            self._retry_stats['dropped_by_breaker'] += 1
+            logger.debug("Dropping %s: %s looks down", url, host)
+            return
+        self._retry_stats['deferred_by_breaker'] += 1
+        self._schedule_retry(url, breaker.retry_delay())
+
+    def _schedule_retry(self, url: str, delay: float):
+        heapq.heappush(self._retry_heap, (time.monotonic() + delay, next(self._retry_counter), url))
+        self._retry_due.add(url)
+        if self._retry_wakeup is not None:
+            self._retry_wakeup.set()
+
+    async def _retry_loop(self):
+        """Move retries back onto the frontier as they come due"""
+        while True:
+            timeout = self._retry_heap[0][0] - time.monotonic() if self._retry_heap else None
+            try:
+                await asyncio.wait_for(self._retry_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._retry_wakeup.clear()
+            now = time.monotonic()
+            if self._retry_heap and self._retry_heap[0][0] <= now:
+                async with self._frontier_cond:
+                    while self._retry_heap and self._retry_heap[0][0] <= now:
+                        url = heapq.heappop(self._retry_heap)[2]
+                        self._retry_due.discard(url)
+                        self.queue.push(url, self._url_priority(url))
+                    self._frontier_cond.notify_all()
+
+    def _form_markers(self, url: str) -> Optional[list]:
+        """Start-tag patterns (on an #id or .class) identifying every form configured for url
+
+        None when the URL has no configured forms or a selector is too complex
+        to recognise in raw bytes; early termination is then not attempted.
+        """
+        selector_set = self._selector_set(self._config_matcher.match(url))
+        if not selector_set.selectors or selector_set.complex:
+            return None
+        markers = []
+        for tag, ids, classes in selector_set.simple.values():
+            if ids:
+                markers.append(start_tag_re(tag, 'id', min(ids)))
+            elif classes:
+                markers.append(start_tag_re(tag, 'class', min(classes)))
+            else:
+                return None
+        return markers
+
+    async def _read_body(self, response: aiohttp.ClientResponse, url: str) -> bytes:
+        """Stream the response body under max_body_bytes, stopping early when allowed
+
+        A body that runs over the budget is truncated there and the partial page
+        is still parsed; nothing past the budget is ever buffered.
+        """
+        limit = self.max_body_bytes
+        markers = self._form_markers(url) if self.stop_when_forms_found else None
+        body = bytearray()
+        scan_from = 0
+        download_started = time.perf_counter()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            if limit and len(body) + len(chunk) > limit:
+                body += chunk[:limit - len(body)]
+                logger.warning("Truncated %s at %d bytes", url, limit, extra={'url': url})
+                self._body_stats['truncated'] += 1
+                break
+            body += chunk
+
+            # Re-scan a little of the previous chunk in case a tag straddles the boundary
+            window_start = max(0, scan_from - 64)
+            scan_from = len(body)
+            if self.stop_at_body_end and BODY_END_RE.search(body, window_start):
+                self._body_stats['stopped_early'] += 1
+                break
+            if markers and self._all_forms_closed(body, markers):
+                self._body_stats['stopped_early'] += 1
+                break
+
+        self.timings.observe('download', time.perf_counter() - download_started)
+        self._body_stats['pages'] += 1
+        self._body_stats['bytes'] += len(body)
+        return bytes(body)
+
+    @staticmethod
+    def _all_forms_closed(body: bytearray, markers: list) -> bool:
+        """True once every marker has appeared and a </form> follows each of them"""
+        last_marker = -1
+        for marker in markers:
+            match = marker.search(body)
+            if match is None:
+                return False
+            last_marker = max(last_marker, match.end())
+        return FORM_END_RE.search(body, last_marker) is not None
+
+    def _add_form(self, form_data: Dict):
+        """Record a discovered form unless it is already known"""
+        signature = form_signature(form_data)
+        if signature in self._form_signatures:
+            return
+        self._form_signatures.add(signature)
+        self.forms_count += 1
+        site = self.site_for(form_data['url'])
+        if site:
+            site.forms_count += 1
+        if self.keep_forms:
+            self.forms_found.append(form_data)
+        if self.sink:
+            self.sink.write(form_data)
+        if self.checkpoint:
+            self.checkpoint.record_form(form_data)
+
+    def _register_links(self, links: list) -> list:
+        """Return the links not seen before and mark them as seen"""
+        new_urls = []
+        for link in links:
+            if link not in self.all_urls:
+                self.all_urls.add(link)
+                if self.obey_robots and not self.robots.allowed(link):
+                    self._robots_blocked += 1
+                    continue
+                new_urls.append(link)
+        return new_urls
+
+    def _reuse_cached_result(self, cached: Dict) -> list:
+        """Replay a stored extraction result for a page that has not changed"""
+        for form_data in cached['forms']:
+            self._add_form(form_data)
+        return self._register_links(cached['links'])
 
     def save_forms_to_csv(self, filename: str = 'form_specs.csv'):
-        """Save discovered forms to CSV"""
+        """Save the in-memory forms_found list to CSV (crawl() streams to output_path instead)"""
         if not self.forms_found:
             logger.warning("No forms found to save")
             return
 
         with open(filename, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow([
-                'Form ID', 'URL', 'Form Selector', 'Success Message Selector', 'Fields',
-                'Form Type', 'Has Meta Description', 'Meta Description',
-                'Has Meta Keywords', 'Meta Keywords', 'SEO Issues'
-            ])
+            writer.writerow(FORM_CSV_HEADER)
 
             for form in self.forms_found:
-                fields_str = ';'.join([
-                    f"{field['selector']}|{field['type']}|{'required' if field['required'] else 'optional'}"
-                    for field in form['fields']
-                ])
-                meta = form.get('meta_info', {})
-                writer.writerow([
-                    form['form_id'],
-                    form['url'],
-                    form['form_selector'],
-                    '.success-message',  # Default success message selector
-                    fields_str,
-                    form['form_type'],
-                    meta.get('has_meta_description', False),
-                    meta.get('meta_description', '')[:200],  # Truncate long descriptions
-                    meta.get('has_meta_keywords', False),
-                    meta.get('meta_keywords', '')[:200],  # Truncate long keywords
-                    '; '.join(meta.get('seo_issues', []))
-                ])
-
-            logger.info(f"Saved {len(self.forms_found)} forms to {filename}")
+                writer.writerow(form_to_row(form))
+
+            logger.info("Saved %d forms to %s", len(self.forms_found), filename)
 
     def _should_stop_crawling(self) -> bool:
         """Check if we should stop crawling"""
-        if len(self.visited) >= self.max_pages:
-            logger.info(f"Reached maximum pages limit: {self.max_pages}")
+        if all(site.exhausted() for site in self.sites):
+            logger.info("Every site reached its page or time budget (%d pages)", self._pages_done)
             return True
 
         elapsed_minutes = (datetime.now() - self.start_time).total_seconds() / 60
         if elapsed_minutes >= self.timeout_minutes:
-            logger.info(f"Reached timeout after {elapsed_minutes:.1f} minutes")
+            logger.info("Reached timeout after %.1f minutes", elapsed_minutes)
             return True
 
         return False
 
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        """Return the shared TCPConnector, creating it on first use"""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.conn_limit,
+                limit_per_host=self.conn_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                ssl=self._ssl_context  # One SSLContext: CA certificates are loaded once, not per connection
+            )
+        return self._connector
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """TraceConfig that feeds the connection reuse counters and the dns/connect/ttfb timings"""
+        def bump(key):
+            async def handler(session, ctx, params):
+                self._conn_stats[key] += 1
+            return handler
+
+        def start(stage):
+            async def handler(session, ctx, params):
+                setattr(ctx, stage, time.perf_counter())
+            return handler
+
+        def end(stage):
+            async def handler(session, ctx, params):
+                started = getattr(ctx, stage, None)
+                if started is not None:
+                    self.timings.observe(stage, time.perf_counter() - started)
+            return handler
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(bump('requests'))
+        trace_config.on_connection_create_end.append(bump('connections_created'))
+        trace_config.on_connection_reuseconn.append(bump('connections_reused'))
+        trace_config.on_dns_cache_hit.append(bump('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(bump('dns_cache_misses'))
+        # 'connect' spans the whole connection setup (DNS, TCP and TLS); 'ttfb' ends when headers arrive
+        trace_config.on_dns_resolvehost_start.append(start('dns'))
+        trace_config.on_dns_resolvehost_end.append(end('dns'))
+        trace_config.on_connection_create_start.append(start('connect'))
+        trace_config.on_connection_create_end.append(end('connect'))
+        trace_config.on_request_start.append(start('ttfb'))
+        trace_config.on_request_end.append(end('ttfb'))
+
+        # Server-side wait for the rate controller: connection in hand to headers received
+        async def connection_ready(session, ctx, params):
+            ctx.connection_ready = time.perf_counter()
+
+        async def headers_received(session, ctx, params):
+            ready = getattr(ctx, 'connection_ready', None)
+            if ready is not None and isinstance(ctx.trace_request_ctx, dict):
+                ctx.trace_request_ctx['ttfb'] = time.perf_counter() - ready
+
+        trace_config.on_connection_create_end.append(connection_ready)
+        trace_config.on_connection_reuseconn.append(connection_ready)
+        trace_config.on_request_end.append(headers_received)
+        return trace_config
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session on top of the shared connection pool"""
+        return aiohttp.ClientSession(
+            connector=self._get_connector(),
+            connector_owner=False,
+            trace_configs=[self._trace_config()]
+        )
+
+    def connection_stats(self) -> Dict:
+        """Connection reuse statistics for the shared pool"""
+        stats = dict(self._conn_stats)
+        opened = stats['connections_created'] + stats['connections_reused']
+        stats['reuse_ratio'] = stats['connections_reused'] / opened if opened else 0.0
+        return stats
+
+    def latency_snapshot(self) -> Dict:
+        """count/sum/mean/p50/p90/p99/max seconds for every stage timed so far"""
+        return self.timings.snapshot()
+
+    def write_metrics(self, path: Optional[str] = None):
+        """Write the stage histograms to path (default metrics_path) in Prometheus text format"""
+        path = path or self.metrics_path
+        if path:
+            self.timings.write_prometheus(path)
+
+    async def _metrics_loop(self):
+        """Refresh the metrics file every metrics_interval seconds"""
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            try:
+                self.write_metrics()
+            except OSError as e:
+                logger.warning("Failed to write metrics to %s: %s", self.metrics_path, e)
+
+    async def close(self):
+        """Close the sessions handed out by get_session() and the shared connection pool"""
+        for session in self._sessions:
+            await session.close()
+        self._sessions.clear()
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
+
+    def _accept_new_urls(self, new_urls: list):
+        """Queue URLs discovered on a page (called with the frontier lock held)"""
+        for new_url in new_urls:
+            if new_url not in self.visited and self._admit(new_url):
+                priority = self._url_priority(new_url)
+                self.queue.push(new_url, priority)
+                self.visited.add(new_url)
+                if self.checkpoint:
+                    self.checkpoint.record_queued(new_url, priority)
+
+    def _awaiting_input(self) -> bool:
+        """Whether idle workers should wait for URLs arriving from outside (see ShardCrawler)"""
+        return False
+
+    def _host_delay(self, host_name: str, in_flight: int) -> float:
+        """Seconds until a host can take one more of our requests (see SiteFrontier)"""
+        host = self.rate_limiter.for_host(host_name)
+        # One request beyond the limit may wait on a slot, so it starts the moment a fetch finishes
+        if in_flight > max(1, int(host.limit)):
+            return math.inf  # A fetch has to finish first, and finishing notifies the waiting workers
+        return host.ready_in()
+
+    async def _wait_for_work(self):
+        """Wait on the frontier condition, waking up no later than the next site deadline or host becoming ready"""
+        now = time.monotonic()
+        timeouts = [site.deadline - now for site in self.sites if site.deadline is not None and not site.timed_out()]
+        ready_in = self.queue.ready_in() if self.queue else None
+        if ready_in is not None:
+            timeouts.append(ready_in)
+        try:
+            await asyncio.wait_for(self._frontier_cond.wait(), min(timeouts) if timeouts else None)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self, session: aiohttp.ClientSession):
+        """Pull URLs from the shared frontier until it is drained or a limit is hit"""
+        while True:
+            async with self._frontier_cond:
+                url = None
+                while not self._should_stop_crawling():
+                    url = self.queue.pop() if self.queue else None
+                    if url or not (self.queue or self._in_flight or self._retry_heap or self._awaiting_input()):
+                        break
+                    await self._wait_for_work()
+                if url is None:
+                    # Nothing left to hand out (or a limit was hit): wake the others so they exit too
+                    self._frontier_cond.notify_all()
+                    return
+                self._in_flight += 1
+
+            new_urls = []
+            try:
+                new_urls = await self._process_url(session, url)
+            finally:
+                async with self._frontier_cond:
+                    self._in_flight -= 1
+                    self.queue.done(url)
+                    self._accept_new_urls(new_urls)
+                    if self.checkpoint and url not in self._retry_due:
+                        # A URL waiting for a retry stays pending in the checkpoint
+                        self.checkpoint.record_done(url)
+                    # This worker takes the freed slot itself; wake one more per new URL rather than every
+                    # idle worker (the last one out still notifies all on its way out)
+                    self._frontier_cond.notify(len(new_urls) + 1)
+
+    def _restore_checkpoint(self) -> bool:
+        """Rebuild the frontier, seen URLs and forms from the checkpoint; False if it is empty"""
+        state = self.checkpoint.load()
+        if not state['seen']:
+            return False
+
+        self.visited.update(state['seen'])
+        self.all_urls.update(state['seen'])
+        pending = {url for url, _ in state['pending']}
+        for url in state['seen']:
+            site = self.site_for(url)
+            if site:
+                site.queued += 1
+                if url not in pending:
+                    site.pages_done += 1  # Handled before the restart; charged like a fetch
+        for url, priority in state['pending']:
+            self.queue.push(url, priority)
+        # Restored forms are already in the (appended-to) output file; only rebuild the dedupe index
+        for form_data in state['forms']:
+            self._form_signatures.add(form_signature(form_data))
+            self.forms_count += 1
+            if self.keep_forms:
+                self.forms_found.append(form_data)
+        # Carry over the time already spent so the timeout budget covers the whole crawl
+        self.start_time -= timedelta(seconds=state['meta'].get('elapsed_seconds', 0))
+        logger.info("Resumed from %s: %d known URLs, %d pending, %d forms",
+                    self.checkpoint_path, len(self.visited), len(self.queue), self.forms_count)
+        return True
+
+    def _elapsed_seconds(self) -> float:
+        return (datetime.now() - self.start_time).total_seconds()
+
+    async def _checkpoint_loop(self):
+        """Flush the checkpoint every checkpoint_interval seconds"""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            self.checkpoint.set_meta('elapsed_seconds', self._elapsed_seconds())
+            if self.sink:
+                # Forms must reach the output before the checkpoint says they were found
+                self.sink.flush()
+            await self.checkpoint.flush()
+
     async def crawl(self):
         """Main crawl method"""
-        logger.info(f"Starting crawl of {self.base_url}")
+        logger.info("Starting crawl of %s", ', '.join(site.base_url for site in self.sites))
         self.start_time = datetime.now()
 
-        async with aiohttp.ClientSession() as session:
-            self.queue = [self.base_url]
-            self.visited.add(self.base_url)
-            self.all_urls.add(self.base_url)
+        async with self._create_session() as session:
+            self.queue = SiteFrontier(self.sites, self._host_delay)
+            self._frontier_cond = asyncio.Condition()
+            checkpoint_task = None
+            if self.parse_workers:
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    initializer=_init_parse_worker,
+                    initargs=(self.site_specs, self.parser, self.form_configs, self.canonicalizer)
+                )
+            if self.validator_cache_path:
+                self.validator_cache = ValidatorStore(self.validator_cache_path)
+            if self.output_path:
+                self.sink = FormSink(self.output_path, self.output_format,
+                                     append=bool(self.resume and self.checkpoint_path))
+            if self.checkpoint_path:
+                self.checkpoint = CrawlCheckpoint(self.checkpoint_path)
+                if not self.resume:
+                    self.checkpoint.reset()  # The CSV starts over too
+                checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+            if not (self.checkpoint and self.resume and self._restore_checkpoint()):
+                for site in self.sites:
+                    self._enqueue(site.base_url, self._url_priority(site.base_url))
+                    if self.seed_sitemaps:
+                        await self._seed_from_sitemaps(session, site)
+            # Site timeouts run from the (possibly resumed) crawl start
+            elapsed = self._elapsed_seconds()
+            for site in self.sites:
+                site.deadline = time.monotonic() + site.timeout_minutes * 60 - elapsed
+            self._in_flight = 0
+            self._pages_done = 0
 
-            while self.queue and not self._should_stop_crawling():
-                current_batch = self.queue[:self.batch_size]
-                self.queue = self.queue[self.batch_size:]
+            # Long-lived workers refill a slot as soon as it frees up instead of
+            # waiting for the slowest page of a fixed batch
+            workers = [asyncio.create_task(self._worker(session)) for _ in range(self.max_concurrency)]
+            metrics_task = asyncio.create_task(self._metrics_loop()) if self.metrics_path else None
+            self._retry_wakeup = asyncio.Event()
+            retry_task = asyncio.create_task(self._retry_loop())
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                retry_task.cancel()
+                if metrics_task:
+                    metrics_task.cancel()
+                    self.write_metrics()
+                if self._parse_pool:
+                    self._parse_pool.shutdown(wait=True, cancel_futures=True)
+                    self._parse_pool = None
+                if self.sink:
+                    self.sink.close()
+                if self.checkpoint:
+                    checkpoint_task.cancel()
+                    self.checkpoint.set_meta('elapsed_seconds', self._elapsed_seconds())
+                    await self.checkpoint.flush()
+                    self.checkpoint.close()
+                    self.checkpoint = None
+                if self.validator_cache:
+                    self.validator_cache.close()
+                    self.validator_cache = None
+                    logger.info("Validator cache stats: %s", self._cache_stats)
 
-                # Process URLs in parallel
-                tasks = [self._process_url(session, url) for url in current_batch]
-                results = await asyncio.gather(*tasks)
+            logger.info("Crawl completed. Found %d forms across %d pages", self.forms_count, self._pages_done)
+            logger.info("Connection stats: %s", self.connection_stats())
+            logger.info("Body stats: %s", self._body_stats)
+            logger.info("Stage latency: %s", self.latency_snapshot())
+            if len(self.sites) > 1:
+                logger.info("Site stats: %s", self.site_stats())
+            logger.info("Retry stats: %s", self._retry_stats)
+            content_types = self.content_types.snapshot()
+            if content_types:
+                logger.info("Content types by path pattern: %s", content_types)
+            if self.obey_robots:
+                logger.info("Skipped %d URLs disallowed by robots.txt", self._robots_blocked)
+            if self.sink:
+                logger.info("Streamed %d forms to %s", self.sink.count, self.output_path)
+                self.sink = None
+        # Sessions from get_session() outlive the crawl; the caller's close() releases the pool then
+        self._sessions = {session for session in self._sessions if not session.closed}
+        if not self._sessions:
+            await self.close()
 
-                # Add new URLs to queue
-                for new_urls in results:
-                    self.queue.extend([url for url in new_urls if url not in self.visited])
-                    self.visited.update(url for url in new_urls if url not in self.visited)
+    async def get_session(self):
+        """Get an aiohttp session for form testing (shares the crawler's connection pool)
 
-                logger.info(f"Processed {len(self.visited)} pages, {len(self.queue)} remaining")
+        The pool stays open while the session does; call close() once done with it.
+        """
+        session = self._create_session()
+        self._sessions.add(session)
+        return session
 
-            logger.info(f"Crawl completed. Found {len(self.forms_found)} forms across {len(self.visited)} pages")
-            self.save_forms_to_csv()
 
-    async def get_session(self):
-        """Get an aiohttp session for form testing"""
-        return aiohttp.ClientSession()
+def shard_for_url(url: str, num_shards: int) -> int:
+    """Shard owning a canonical URL"""
+    return url_fingerprint(url) % num_shards
+
+
+class QueueFormSink:
+    """FormSink stand-in that ships form batches to the coordinator over a multiprocessing queue"""
+
+    def __init__(self, results, batch_size: int = 50):
+        self.results = results
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch = []
+
+    def write(self, form: Dict):
+        self._batch.append(form)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._batch:
+            self.results.put(self._batch)
+            self._batch = []
+
+    def close(self):
+        self.flush()
+
+
+class ShardCrawler(WebCrawler):
+    """WebCrawler that owns one hash partition of the URL space
+
+    Discovered URLs owned by other shards are batched into their inboxes;
+    URLs arriving in this shard's inbox are queued locally. Workers idle
+    instead of exiting until the coordinator sends 'stop'.
+
+    Every shard fetches from the same hosts, so each gets 1/num_shards of the
+    per-host politeness budget: rate, concurrency, connections and Crawl-delay.
+    """
+
+    def __init__(self, shard_id: int, num_shards: int, inboxes: list, status, results,
+                 route_batch_size: int = 100, route_interval: float = 0.05, **kwargs):
+        super().__init__(**kwargs)
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self.max_concurrency = max(1, self.max_concurrency // num_shards)
+        self.rate_limiter.max_concurrency = max(1, self.rate_limiter.max_concurrency // num_shards)
+        self.rate_limiter.initial_concurrency = max(1, self.rate_limiter.initial_concurrency // num_shards)
+        self.rate_limiter.requests_per_second /= num_shards
+        self.conn_limit_per_host = max(1, self.conn_limit_per_host // num_shards)
+        self.inboxes = inboxes
+        self.status = status
+        self.route_batch_size = route_batch_size
+        self.route_interval = route_interval
+        self.keep_forms = False
+        self.sink = self._results_sink = QueueFormSink(results)
+        self._early_urls = []
+        self._outbox = {shard: [] for shard in range(num_shards) if shard != shard_id}
+        self._sent = 0
+        self._received = 0
+        self._stop_requested = False
+        self._crawl_finished = False
+
+    def _owns(self, url: str) -> bool:
+        return shard_for_url(url, self.num_shards) == self.shard_id
+
+    def _apply_crawl_delay(self, host: str, delay: float):
+        # Each shard waits num_shards delays, so together they make one request per delay
+        super()._apply_crawl_delay(host, delay * self.num_shards)
+
+    def _route(self, url: str):
+        shard = shard_for_url(url, self.num_shards)
+        batch = self._outbox[shard]
+        batch.append(url)
+        if len(batch) >= self.route_batch_size:
+            self._flush_outbox(shard)
+
+    def _flush_outbox(self, shard: int):
+        batch = self._outbox[shard]
+        if batch:
+            self.inboxes[shard].put(('urls', batch))
+            self._sent += len(batch)
+            self._outbox[shard] = []
+
+    def _enqueue(self, url: str, priority: float):
+        if self._owns(url):
+            super()._enqueue(url, priority)
+        else:
+            self.all_urls.add(url)
+            self._route(url)
+
+    def _accept_new_urls(self, new_urls: list):
+        owned = []
+        for url in new_urls:
+            if self._owns(url):
+                owned.append(url)
+            else:
+                self._route(url)
+        super()._accept_new_urls(owned)
+
+    def _awaiting_input(self) -> bool:
+        return not self._stop_requested
+
+    def _idle(self) -> bool:
+        if self._frontier_cond is None or self._early_urls or any(self._outbox.values()):
+            return False
+        return self._crawl_finished or (not self.queue and not self._in_flight and not self._retry_heap)
+
+    async def _receive(self, url: str):
+        self._received += 1
+        if self._frontier_cond is None:
+            self._early_urls.append(url)  # crawl() has not built the frontier yet
+            return
+        if self._crawl_finished or url in self.visited or self._should_stop_crawling():
+            return
+        self.all_urls.add(url)
+        async with self._frontier_cond:
+            self._accept_new_urls([url])
+            self._frontier_cond.notify_all()
+
+    async def _exchange_loop(self):
+        """Move URL batches in and out and report progress until the coordinator says stop"""
+        loop = asyncio.get_running_loop()
+        inbox = self.inboxes[self.shard_id]
+        while True:
+            if self._early_urls and self._frontier_cond is not None:
+                early, self._early_urls = self._early_urls, []
+                self._received -= len(early)
+                for url in early:
+                    await self._receive(url)
+            for shard in self._outbox:
+                self._flush_outbox(shard)
+            self._results_sink.flush()
+            self.status.put((self.shard_id, self._sent, self._received, self._idle()))
+            try:
+                message = await loop.run_in_executor(None, inbox.get, True, self.route_interval)
+            except queue.Empty:
+                continue
+            if message[0] == 'stop':
+                self._stop_requested = True
+                if self._frontier_cond is not None:
+                    async with self._frontier_cond:
+                        self._frontier_cond.notify_all()
+                return
+            for url in message[1]:
+                await self._receive(url)
+
+    async def run(self):
+        exchange = asyncio.create_task(self._exchange_loop())
+        try:
+            await self.crawl()
+        finally:
+            self._crawl_finished = True
+        await exchange
+
+
+def _run_shard(shard_id: int, num_shards: int, inboxes: list, status, results, crawler_kwargs: Dict):
+    """Process entry point for one shard"""
+    _restart_logging_in_child()
+    crawler = ShardCrawler(shard_id, num_shards, inboxes, status, results, **crawler_kwargs)
+    try:
+        asyncio.run(crawler.run())
+    finally:
+        stop_logging()
+    results.put(crawler._pages_done)  # Marks this shard's results as complete and says how many pages it fetched
+
+
+class ShardedCrawler:
+    """Runs N ShardCrawler processes over one site and merges their forms into one output
+
+    Each process owns the URLs whose canonical-URL fingerprint falls into its
+    shard. The crawl ends when every shard is idle and every routed URL has
+    been received, observed on two consecutive polls.
+    """
+
+    def __init__(self, base_url, num_shards: int = 4, output_path: Optional[str] = 'form_specs.csv',
+                 output_format: Optional[str] = None, max_pages: int = 500, timeout_minutes: int = 30,
+                 poll_interval: float = 0.05, **crawler_kwargs):
+        self.base_url = base_url
+        self.num_shards = num_shards
+        self.output_path = output_path
+        self.output_format = output_format
+        self.max_pages = max_pages
+        self.timeout_minutes = timeout_minutes
+        self.poll_interval = poll_interval
+        self.crawler_kwargs = crawler_kwargs
+        self.forms_count = 0
+        self.pages_fetched = 0
+
+    def _shard_kwargs(self, shard_id: int) -> Dict:
+        kwargs = dict(self.crawler_kwargs)
+        kwargs.update(
+            base_url=self.base_url,
+            output_path=None,
+            max_pages=-(-self.max_pages // self.num_shards),
+            timeout_minutes=self.timeout_minutes
+        )
+        if not isinstance(self.base_url, str):
+            # Split explicit per-site page budgets the same way as the default one
+            kwargs['base_url'] = [
+                dict(spec, max_pages=-(-spec['max_pages'] // self.num_shards))
+                if isinstance(spec, dict) and 'max_pages' in spec else spec
+                for spec in self.base_url
+            ]
+        # Per-shard local stores; SQLite files are not shared between processes
+        for key in ('checkpoint_path', 'validator_cache_path'):
+            if kwargs.get(key):
+                kwargs[key] = f"{kwargs[key]}.shard{shard_id}"
+        return kwargs
+
+    def run(self) -> Dict:
+        """Run the crawl to completion and return a small summary"""
+        started = time.monotonic()
+        inboxes = [multiprocessing.Queue() for _ in range(self.num_shards)]
+        status = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=_run_shard,
+                args=(shard_id, self.num_shards, inboxes, status, results, self._shard_kwargs(shard_id)),
+                name=f"shard-{shard_id}"
+            )
+            for shard_id in range(self.num_shards)
+        ]
+        for process in processes:
+            process.start()
+
+        sink = FormSink(self.output_path, self.output_format) if self.output_path else None
+        signatures = set()
+        latest = {}
+        stable_totals = None
+        finished_shards = 0
+
+        def drain_results(block: bool = False):
+            nonlocal finished_shards
+            while True:
+                try:
+                    batch = results.get(block, 1.0) if block else results.get_nowait()
+                except queue.Empty:
+                    return
+                if isinstance(batch, int):
+                    finished_shards += 1
+                    self.pages_fetched += batch
+                    if block:
+                        return
+                    continue
+                for form in batch:
+                    signature = form_signature(form)
+                    if signature not in signatures:
+                        signatures.add(signature)
+                        self.forms_count += 1
+                        if sink:
+                            sink.write(form)
+
+        try:
+            while True:
+                drain_results()
+                while True:
+                    try:
+                        shard_id, sent, received, idle = status.get_nowait()
+                    except queue.Empty:
+                        break
+                    latest[shard_id] = (sent, received, idle)
+
+                # Shards only exit after 'stop'; an earlier exit means it crashed
+                for process in processes:
+                    if process.exitcode is not None:
+                        raise RuntimeError(f"Shard process {process.name} exited with code "
+                                           f"{process.exitcode} before the crawl finished")
+
+                timed_out = time.monotonic() - started >= self.timeout_minutes * 60
+                if len(latest) == self.num_shards:
+                    totals = (sum(v[0] for v in latest.values()), sum(v[1] for v in latest.values()))
+                    all_idle = all(v[2] for v in latest.values())
+                    if all_idle and totals[0] == totals[1]:
+                        if stable_totals == totals:
+                            break
+                        stable_totals = totals
+                        latest = {}  # Require a fresh report from every shard before confirming
+                    else:
+                        stable_totals = None
+                if timed_out:
+                    logger.info("Sharded crawl reached timeout after %s minutes", self.timeout_minutes)
+                    break
+                time.sleep(self.poll_interval)
+
+            for inbox in inboxes:
+                inbox.put(('stop',))
+            while finished_shards < self.num_shards and any(p.is_alive() for p in processes):
+                drain_results(block=True)
+            drain_results()
+            for process in processes:
+                process.join()
+        finally:
+            if sink:
+                sink.close()
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        elapsed = time.monotonic() - started
+        logger.info("Sharded crawl with %d processes fetched %d pages and found %d forms in %.1fs",
+                    self.num_shards, self.pages_fetched, self.forms_count, elapsed)
+        return {'shards': self.num_shards, 'pages': self.pages_fetched, 'forms': self.forms_count, 'seconds': elapsed}